@@ -88,11 +88,13 @@ def now_iso() -> str:
 
 def safe_csv_write(path: Path, rows: list[dict], headers: list[str]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", newline="", encoding="utf-8") as f:
+    tmp = path.with_name(path.name + ".tmp")  # atomic: never leave a truncated CSV
+    with tmp.open("w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=headers)
         w.writeheader()
         for r in rows:
             w.writerow({k: r.get(k, "") for k in headers})
+    os.replace(tmp, path)
 
 def read_csv_as_dicts(path: Path) -> list[dict]:
     if not path.exists():
@@ -216,7 +218,7 @@ MANIFEST_FIELDS = [
     "sdf_status","sdf_path","sdf_reason",
     "pdbqt_status","pdbqt_path","pdbqt_reason",
     "vina_status","vina_score","vina_pose","vina_reason",
-    "config_hash","receptor_sha1","tools_obabel","tools_meeko","tools_vina",
+    "config_hash","receptor_digest","tools_obabel","tools_meeko","tools_vina",
     "created_at","updated_at"
 ]
 
@@ -228,6 +230,7 @@ def load_manifest(path: Path) -> dict[str, dict]:
     rows = read_csv_as_dicts(path)
     for r in rows:
         row = {k: r.get(k, "") for k in MANIFEST_FIELDS}
+        row["receptor_digest"] = row["receptor_digest"] or r.get("receptor_sha1", "")  # renamed column
         existing[row["id"]] = row
     return existing
 
@@ -12,6 +12,8 @@ Module 2 (RDKit): SMILES -> 3D SDF  [GRACEFUL STOP ENABLED]
     - 3D_Structures/<id>.sdf  (atomic write; never left empty)
     - 3D_Structures/<id>_rdkit.log  (overwritten each run)
     - Updates state/manifest.csv (sdf_* fields)
+- Fresh builds run in parallel worker processes (config: parallel.enabled /
+  parallel.max_workers / parallel.checkpoint_every, as in Module 3).
 
 Run:  python Module 2.py
 """
@@ -25,6 +27,7 @@ import signal
 import sys
 from pathlib import Path
 from datetime import datetime, timezone
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 # --- Graceful stop flags ---
 STOP_REQUESTED = False
@@ -79,11 +82,13 @@ def read_csv(path: Path) -> list[dict]:
 
 def write_csv(path: Path, rows: list[dict], headers: list[str]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", newline="", encoding="utf-8") as f:
+    tmp = path.with_name(path.name + ".tmp")  # atomic: never leave a truncated CSV
+    with tmp.open("w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=headers)
         w.writeheader()
         for r in rows:
             w.writerow({k: r.get(k, "") for k in headers})
+    os.replace(tmp, path)
 
 def read_lines(path: Path) -> list[str]:
     if not path.exists():
@@ -120,6 +125,11 @@ DEFAULTS = {
     },
     "policy": {
         "skip_if_done": True                # skip only if existing SDF validates
+    },
+    "parallel": {
+        "enabled": True,
+        "max_workers": None,                # default: min(8, max(1, cpu_count()-1))
+        "checkpoint_every": 50              # save manifest every N completions
     }
 }
 
@@ -161,7 +171,7 @@ MANIFEST_FIELDS = [
     "sdf_status","sdf_path","sdf_reason",
     "pdbqt_status","pdbqt_path","pdbqt_reason",
     "vina_status","vina_score","vina_pose","vina_reason",
-    "config_hash","receptor_sha1","tools_rdkit","tools_meeko","tools_vina",
+    "config_hash","receptor_digest","tools_rdkit","tools_meeko","tools_vina",
     "created_at","updated_at"
 ]
 
@@ -172,6 +182,7 @@ def load_manifest() -> dict[str, dict]:
     out = {}
     for r in rows:
         row = {k: r.get(k, "") for k in MANIFEST_FIELDS}
+        row["receptor_digest"] = row["receptor_digest"] or r.get("receptor_sha1", "")  # renamed column
         out[row["id"]] = row
     return out
 
@@ -261,6 +272,78 @@ def rdkit_make_sdf(smiles: str, out_sdf: Path, ff: str = "UFF", max_iters: int =
             pass
         return False, f"RDKit error: {e}"
 
+def worker_build(lig_id: str, smiles: str, out_sdf_str: str, force_field: str, minimize_steps: int) -> tuple[str, bool, str]:
+    """Build one SDF and write its per-ligand log. Runs in a worker process."""
+    out_sdf = Path(out_sdf_str)
+    ok, reason = rdkit_make_sdf(smiles, out_sdf, ff=force_field, max_iters=minimize_steps)
+
+    # Atom count (for log)
+    atom_count = "?"
+    try:
+        if ok:
+            suppl = Chem.SDMolSupplier(str(out_sdf), removeHs=False)
+            mol0 = next((m for m in suppl if m is not None), None)
+            if mol0:
+                atom_count = str(mol0.GetNumAtoms())
+    except Exception:
+        pass
+
+    # Overwrite log each run
+    log_text = [
+        f"RDKit build for {lig_id}",
+        f"SMILES: {smiles}",
+        f"Force field: {force_field}",
+        f"Minimize steps: {minimize_steps}",
+        f"Output SDF: {out_sdf}",
+        f"Result: {'OK' if ok else 'FAIL'}; Reason: {reason}; atoms={atom_count}",
+    ]
+    log_write(out_sdf.with_name(out_sdf.stem + "_rdkit.log"), "\n".join(log_text) + "\n", mode="w")
+    return lig_id, ok, reason
+
+def _worker_init() -> None:
+    # Ctrl+C is handled by the parent; workers finish their current ligand.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def build_serial(jobs: list[tuple[str, str, str]], force_field: str, minimize_steps: int):
+    for lig_id, smiles, out_sdf in jobs:
+        if STOP_REQUESTED or HARD_STOP:
+            print("🧾 Stop requested — finalizing after this checkpoint...")
+            return
+        yield worker_build(lig_id, smiles, out_sdf, force_field, minimize_steps)
+
+def build_parallel(jobs: list[tuple[str, str, str]], force_field: str, minimize_steps: int, max_workers: int):
+    """Yield worker_build results as they complete, keeping about two ligands per worker in flight."""
+    pending = iter(jobs)
+    in_flight: dict = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_worker_init) as executor:
+        def fill():
+            while len(in_flight) < 2 * max_workers and not (STOP_REQUESTED or HARD_STOP):
+                job = next(pending, None)
+                if job is None:
+                    return
+                in_flight[executor.submit(worker_build, *job, force_field, minimize_steps)] = job
+
+        fill()
+        announced = False
+        while in_flight:
+            if (STOP_REQUESTED or HARD_STOP) and not announced:
+                announced = True
+                print("🧾 Stop requested — no new ligands; finishing the ones in progress...")
+            if HARD_STOP:
+                for fut in in_flight:
+                    fut.cancel()
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                lig_id = in_flight.pop(fut)[0]
+                if fut.cancelled():
+                    continue
+                try:
+                    yield fut.result()
+                except Exception as e:
+                    # A worker crashed before returning
+                    yield lig_id, False, f"Worker error: {e}"
+            fill()
+
 # ------------------------------ Main -----------------------------------------
 def main():
     if not FILE_INPUT.exists():
@@ -273,6 +356,10 @@ def main():
     minimize_steps = int(cfg["chemistry"].get("minimize_steps", 200))
     force_field = str(cfg["chemistry"].get("force_field", "UFF")).upper()
     skip_if_done = bool(cfg["policy"].get("skip_if_done", True))
+    par = cfg.get("parallel", {})
+    par_enabled = bool(par.get("enabled", True))
+    max_workers = par.get("max_workers") or max(1, min(8, (os.cpu_count() or 2) - 1))
+    checkpoint_every = max(1, int(par.get("checkpoint_every", 50)))
 
     # Determine ligands to process
     input_rows = read_csv(FILE_INPUT)
@@ -300,6 +387,8 @@ def main():
     done, failed = 0, 0
 
     try:
+        # Serial pass: .smi files and skip-if-valid; only fresh builds go to the workers.
+        jobs: list[tuple[str, str, str]] = []  # (lig_id, smiles, out_sdf)
         for idx, lig_id in enumerate(ids, 1):
             # Respect user stop request
             if STOP_REQUESTED:
@@ -339,53 +428,41 @@ def main():
                     save_manifest(manifest)
                 continue
 
-            # Fresh RDKit build (atomic)
-            ok, reason = rdkit_make_sdf(smiles, out_sdf, ff=force_field, max_iters=minimize_steps)
+            # Needs a fresh RDKit build (atomic; done below, in parallel when enabled)
+            jobs.append((lig_id, smiles, str(out_sdf)))
 
-            # Atom count (for log)
-            atom_count = "?"
-            try:
-                if ok:
-                    suppl = Chem.SDMolSupplier(str(out_sdf), removeHs=False)
-                    mol0 = next((m for m in suppl if m is not None), None)
-                    if mol0:
-                        atom_count = str(mol0.GetNumAtoms())
-            except Exception:
-                pass
-
-            # Overwrite log each run
-            log_text = [
-                f"RDKit build for {lig_id}",
-                f"SMILES: {smiles}",
-                f"Force field: {force_field}",
-                f"Minimize steps: {minimize_steps}",
-                f"Output SDF: {out_sdf}",
-                f"Result: {'OK' if ok else 'FAIL'}; Reason: {reason}; atoms={atom_count}",
-            ]
-            log_write(out_log, "\n".join(log_text) + "\n", mode="w")
-
-            # Update manifest
-            m = manifest.get(lig_id, {k:"" for k in MANIFEST_FIELDS})
-            m["id"] = lig_id
-            m["smiles"] = smiles
-            if not m.get("created_at"):
-                m["created_at"] = created_ts
-            m["updated_at"] = now_iso()
-            m["config_hash"] = chash
-            m["sdf_path"] = str(out_sdf)
-            m["sdf_status"] = "DONE" if ok else "FAILED"
-            m["sdf_reason"] = "OK" if ok else reason
-            m["tools_rdkit"] = getattr(Chem, "__version__", "RDKit")
-            manifest[lig_id] = m
-
-            if ok:
-                done += 1
+        if jobs and not (STOP_REQUESTED or HARD_STOP):
+            if par_enabled and max_workers > 1 and len(jobs) > 1:
+                workers = min(max_workers, len(jobs))
+                print(f"🧵 Parallel RDKit enabled: workers={workers} jobs={len(jobs)}")
+                results = build_parallel(jobs, force_field, minimize_steps, workers)
             else:
-                failed += 1
+                results = build_serial(jobs, force_field, minimize_steps)
+            id2sdf = {lig_id: out_sdf for lig_id, _, out_sdf in jobs}
+
+            for n, (lig_id, ok, reason) in enumerate(results, 1):
+                # Update manifest (main process only)
+                m = manifest.get(lig_id, {k:"" for k in MANIFEST_FIELDS})
+                m["id"] = lig_id
+                m["smiles"] = id2smiles.get(lig_id, "")
+                if not m.get("created_at"):
+                    m["created_at"] = created_ts
+                m["updated_at"] = now_iso()
+                m["config_hash"] = chash
+                m["sdf_path"] = id2sdf[lig_id]
+                m["sdf_status"] = "DONE" if ok else "FAILED"
+                m["sdf_reason"] = "OK" if ok else reason
+                m["tools_rdkit"] = getattr(Chem, "__version__", "RDKit")
+                manifest[lig_id] = m
 
-            # periodic checkpoint to be extra safe
-            if idx % 50 == 0:
-                save_manifest(manifest)
+                if ok:
+                    done += 1
+                else:
+                    failed += 1
+
+                # periodic checkpoint to be extra safe
+                if n % checkpoint_every == 0:
+                    save_manifest(manifest)
 
     finally:
         # Always flush manifest even on Ctrl+C or unexpected exceptions
@@ -102,11 +102,13 @@ def read_csv(path: Path) -> list[dict]:
 
 def write_csv(path: Path, rows: list[dict], headers: list[str]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", newline="", encoding="utf-8") as f:
+    tmp = path.with_name(path.name + ".tmp")  # atomic: never leave a truncated CSV
+    with tmp.open("w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=headers)
         w.writeheader()
         for r in rows:
             w.writerow({k: r.get(k, "") for k in headers})
+    os.replace(tmp, path)
 
 
 def deep_update(dst: dict, src: dict):
@@ -166,7 +168,7 @@ MANIFEST_FIELDS = [
     "sdf_status","sdf_path","sdf_reason",
     "pdbqt_status","pdbqt_path","pdbqt_reason",
     "vina_status","vina_score","vina_pose","vina_reason",
-    "config_hash","receptor_sha1","tools_rdkit","tools_meeko","tools_vina",
+    "config_hash","receptor_digest","tools_rdkit","tools_meeko","tools_vina",
     "created_at","updated_at"
 ]
 
@@ -178,6 +180,7 @@ def load_manifest() -> dict[str, dict]:
     out = {}
     for r in rows:
         row = {k: r.get(k, "") for k in MANIFEST_FIELDS}
+        row["receptor_digest"] = row["receptor_digest"] or r.get("receptor_sha1", "")  # renamed column
         out[row["id"]] = row
     return out
 
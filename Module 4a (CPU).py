@@ -3,7 +3,9 @@
 """
 Module 4a: Docking with AutoDock Vina (CPU)  [GRACEFUL STOP ENABLED]
 - Reads VinaConfig.txt next to Vina binary (simple key=value file)
-- Docks all prepared_ligands/*.pdbqt
+- Docks all prepared_ligands/*.pdbqt in parallel (N_JOBS workers x CORES_PER_JOB Vina threads)
+- Vina >= 1.2: receptor grid maps are written once, then ligands are docked in
+  groups via --maps/--batch (falls back to one process per ligand otherwise)
 - Writes:
     results/<id>_out.pdbqt       (atomic write)
     results/<id>_vina.log        (stdout/stderr capture)
@@ -19,31 +21,116 @@ import argparse
 import csv
 import hashlib
 import json
+import mmap
+import operator
 import os
-import re
-import shlex
 import signal
+import shutil
 import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, Tuple, Optional
+from typing import Dict, Iterable, Iterator, Sequence, Tuple, Optional
+
+# Optional: NumPy speeds up ranking very large leaderboards
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# ---------------- Tunables ----------------
+# Vina's per-ligand setup does not scale with --cpu, so many small jobs beat
+# one wide job. Aggregate parallelism = N_JOBS x CORES_PER_JOB.
+CORES_PER_JOB = 4
+N_JOBS = max(1, (os.cpu_count() or 1) // CORES_PER_JOB)
+CHECKPOINT_EVERY = 50
+# Ligands per Vina --batch process (0 = one Vina process per ligand). Groups
+# are also capped by command-line length to stay under Windows' limit.
+VINA_BATCH_SIZE = 16
+VINA_BATCH_MAX_ARGV = 20000
+# Leaderboards at least this long are ranked with numpy.argsort (if available).
+NUMPY_RANK_MIN = 10_000
+# ------------------------------------------
 
 # ---------------- Graceful Stop (Ctrl+C) ----------------
 STOP_REQUESTED = False
 HARD_STOP = False
+# Vina processes started by this process. Each runs in its own session (POSIX)
+# so a terminal Ctrl+C does not reach it; a second Ctrl+C reaps them instead.
+_CHILDREN: set[subprocess.Popen] = set()
+KILL_GRACE_S = 3.0
+
+def _signal_children(sig: int) -> None:
+    for proc in list(_CHILDREN):
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, sig)
+            elif sig == signal.SIGTERM:
+                proc.terminate()
+            else:
+                proc.kill()
+        except OSError:
+            pass
+
+def _kill_children() -> None:
+    """SIGTERM every running Vina group; SIGKILL any still running after KILL_GRACE_S."""
+    if not _CHILDREN:
+        return
+    _signal_children(signal.SIGTERM)
+    # The interrupted Popen.wait() in the main thread reaps them; escalate from a timer.
+    timer = threading.Timer(KILL_GRACE_S, _signal_children,
+                            args=(getattr(signal, "SIGKILL", signal.SIGTERM),))
+    timer.daemon = True
+    timer.start()
 
 def _handle_sigint(sig, frame):
     global STOP_REQUESTED, HARD_STOP
     if not STOP_REQUESTED:
         STOP_REQUESTED = True
-        print("\n⏹️  Ctrl+C detected — finishing current ligand, then exiting cleanly...")
+        print("\n⏹️  Ctrl+C detected — finishing running ligands, then exiting cleanly...")
         print("   (Press Ctrl+C again to stop ASAP after a safe checkpoint.)")
     else:
         HARD_STOP = True
-        print("\n⏭️  Second Ctrl+C — will abort the loop ASAP and finalize outputs.")
+        print("\n⏭️  Second Ctrl+C — stopping running Vina jobs and finalizing outputs.")
+        _kill_children()
 
 signal.signal(signal.SIGINT, _handle_sigint)
 
+def _worker_sigterm(sig, frame):
+    # Sent by the parent on a second Ctrl+C: take our Vina jobs down with us.
+    _signal_children(signal.SIGTERM)
+    procs = [p.pid for p in _CHILDREN]
+    deadline = time.monotonic() + KILL_GRACE_S
+    while procs and time.monotonic() < deadline:
+        time.sleep(0.05)
+        try:
+            procs = [pid for pid in procs if os.waitpid(pid, os.WNOHANG)[0] == 0]
+        except ChildProcessError:
+            break
+    if procs:
+        _signal_children(signal.SIGKILL)
+    os._exit(128 + signal.SIGTERM)
+
+def _worker_init() -> None:
+    # Ctrl+C is handled by the parent; workers finish their current ligand.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if os.name == "posix":
+        signal.signal(signal.SIGTERM, _worker_sigterm)
+
+def _terminate_workers(executor: ProcessPoolExecutor) -> None:
+    terminate = getattr(executor, "terminate_workers", None)  # Python 3.14+
+    if terminate is not None:
+        terminate()
+        return
+    for proc in list((getattr(executor, "_processes", None) or {}).values()):
+        try:
+            proc.terminate()
+        except Exception:
+            pass
+
 # ---------------- Paths ----------------
 BASE = Path(".").resolve()
 DIR_PREP = BASE / "prepared_ligands"
@@ -52,12 +139,19 @@ DIR_STATE = BASE / "state"
 DIR_REC_FALLBACK = BASE / "receptors" / "target_prepared.pdbqt"
 
 FILE_MANIFEST = DIR_STATE / "manifest.csv"
+FILE_MANIFEST_DELTA = DIR_STATE / "manifest.jsonl"  # per-ligand updates, compacted into the CSV at exit
+FILE_CURRENT_CONFIG = DIR_STATE / "current_config.json"  # receptor size/mtime + digest, so an untouched receptor is not re-hashed
+FILE_POSE_INDEX = DIR_STATE / "pose_index.json"  # id -> [config_hash, receptor digest, score, size, mtime_ns]
 FILE_SUMMARY = DIR_RESULTS / "summary.csv"
 FILE_LEADER = DIR_RESULTS / "leaderboard.csv"
 
 for d in (DIR_RESULTS, DIR_STATE):
     d.mkdir(parents=True, exist_ok=True)
 
+# Resolved once; per-ligand paths are plain joins (no realpath per ligand)
+RES_ABS = DIR_RESULTS.resolve()
+PREP_ABS = DIR_PREP.resolve()
+
 # -------------- Utilities --------------
 def now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00","Z")
@@ -72,25 +166,64 @@ def only_ids_from_env() -> set[str] | None:
         return set()
     return {ln.strip() for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()}
 
-def read_csv(path: Path) -> list[dict]:
-    if not path.exists(): return []
+def iter_ligands(root: Path) -> Iterator[Path]:
+    """Yield *.pdbqt files in root (unordered) via a single scandir pass."""
+    with os.scandir(root) as it:
+        for e in it:
+            if e.name.endswith(".pdbqt") and e.is_file():
+                yield Path(e.path)
+
+def read_rows(path: Path, fields: Sequence[str]) -> Iterator[dict]:
+    """Stream CSV rows as dicts holding exactly `fields` ("" for absent columns).
+
+    One csv.reader pass with column positions resolved once from the header,
+    instead of DictReader dicts that are then re-projected.
+    """
+    if not path.exists():
+        return
     with path.open("r", newline="", encoding="utf-8") as f:
-        return [dict(r) for r in csv.DictReader(f)]
+        r = csv.reader(f)
+        header = next(r, None)
+        if header is None:
+            return
+        pad = len(header)  # absent columns read this always-empty slot
+        pos = {name: i for i, name in reversed(list(enumerate(header)))}
+        for old, new in RENAMED_FIELDS.items():
+            if old in pos:
+                pos.setdefault(new, pos[old])
+        get = operator.itemgetter(*(pos.get(k, pad) for k in fields))
+        for row in r:
+            if not row:
+                continue
+            row += [""] * (pad + 1 - len(row))
+            yield dict(zip(fields, get(row)))
+
+def write_rows(path: Path, headers: list[str], rows: Iterable[Sequence]) -> None:
+    """Write header + value rows (already in header order) through a 1 MiB buffer.
 
-def write_csv(path: Path, rows: list[dict], headers: list[str]) -> None:
+    The CSV is written to a sibling .tmp file and renamed over `path`, so a
+    kill mid-write leaves the previous version intact.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=headers)
-        w.writeheader()
-        for r in rows:
-            w.writerow({k: r.get(k,"") for k in headers})
-
-def sha1_of_file(path: Path) -> str:
-    h = hashlib.sha1()
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", newline="", encoding="utf-8", buffering=1<<20) as f:
+        w = csv.writer(f)
+        w.writerow(headers)
+        w.writerows(rows)
+    os.replace(tmp, path)
+
+# SHA-256 runs on the CPU's SHA extensions via OpenSSL where available.
+DIGEST_ALGO = "sha256" if "sha256" in hashlib.algorithms_guaranteed else "sha1"
+
+def digest_of_file(path: Path, algo: str = DIGEST_ALGO) -> str:
     with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1<<20), b""):
-            h.update(chunk)
-    return h.hexdigest()
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+: hashing loop runs in C
+            return hashlib.file_digest(f, algo).hexdigest()
+        h = hashlib.new(algo)
+        if os.fstat(f.fileno()).st_size:  # mmap rejects empty files
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        return h.hexdigest()
 
 # -------------- Manifest ---------------
 MANIFEST_FIELDS = [
@@ -99,22 +232,45 @@ MANIFEST_FIELDS = [
     "sdf_status","sdf_path","sdf_reason",
     "pdbqt_status","pdbqt_path","pdbqt_reason",
     "vina_status","vina_score","vina_pose","vina_reason",
-    "config_hash","receptor_sha1","tools_rdkit","tools_meeko","tools_vina",
+    "config_hash","receptor_digest","tools_rdkit","tools_meeko","tools_vina",
     "created_at","updated_at"
 ]
+_EMPTY = {k: "" for k in MANIFEST_FIELDS}  # template for new rows; always .copy()
+# Columns renamed since older manifests were written: old name -> current name
+RENAMED_FIELDS = {"receptor_sha1": "receptor_digest"}
 
 def load_manifest() -> dict[str, dict]:
-    if not FILE_MANIFEST.exists(): return {}
-    rows = read_csv(FILE_MANIFEST)
-    out = {}
-    for r in rows:
-        row = {k: r.get(k,"") for k in MANIFEST_FIELDS}
-        out[row["id"]] = row
+    out = {row["id"]: row for row in read_rows(FILE_MANIFEST, MANIFEST_FIELDS)}
+    # Replay updates a previous run logged but never compacted (crash/kill)
+    if FILE_MANIFEST_DELTA.exists():
+        with open(FILE_MANIFEST_DELTA, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    delta = json.loads(line)
+                except ValueError:
+                    continue  # torn last line
+                for old, new in RENAMED_FIELDS.items():
+                    if old in delta:
+                        delta.setdefault(new, delta.pop(old))
+                row = out.setdefault(delta["id"], _EMPTY.copy())
+                row.update({k: v for k, v in delta.items() if k in MANIFEST_FIELDS})
     return out
 
+# Rows always carry every field (loaded rows are padded, new rows start from _EMPTY)
+_MANIFEST_ROW = operator.itemgetter(*MANIFEST_FIELDS)
+
 def save_manifest(manifest: dict[str, dict]) -> None:
-    rows = [{k: v.get(k,"") for k in MANIFEST_FIELDS} for _,v in sorted(manifest.items())]
-    write_csv(FILE_MANIFEST, rows, MANIFEST_FIELDS)
+    write_rows(FILE_MANIFEST, MANIFEST_FIELDS,
+               (_MANIFEST_ROW(v) for _,v in sorted(manifest.items())))
+
+def append_manifest_delta(row: dict) -> None:
+    with open(FILE_MANIFEST_DELTA, "a", encoding="utf-8") as f:
+        f.write(json.dumps(row) + "\n")
+
+def compact_manifest(manifest: dict[str, dict]) -> None:
+    """Rewrite the CSV once, then drop the delta log it now contains."""
+    save_manifest(manifest)
+    FILE_MANIFEST_DELTA.unlink(missing_ok=True)
 
 # -------------- Config (from Vina dir) --------------
 def find_vina_binary(vina_arg: str | None = None) -> Path:
@@ -178,6 +334,55 @@ def as_int(d: Dict[str,str], k: str, default: int) -> int:
     except Exception:
         return int(default)
 
+def _cfg_hash(box: dict, vcfg: dict) -> str:
+    payload = json.dumps({"box": box, "vcfg": vcfg}, sort_keys=True)
+    return hashlib.new(DIGEST_ALGO, payload.encode("utf-8")).hexdigest()[:10]
+
+def load_current_config() -> dict:
+    try:
+        return json.loads(FILE_CURRENT_CONFIG.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def save_current_config(cur: dict) -> None:
+    tmp = FILE_CURRENT_CONFIG.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(cur, indent=2), encoding="utf-8")
+    os.replace(tmp, FILE_CURRENT_CONFIG)
+
+def load_pose_index() -> dict[str, list]:
+    try:
+        return json.loads(FILE_POSE_INDEX.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def save_pose_index(index: dict[str, list]) -> None:
+    tmp = FILE_POSE_INDEX.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, FILE_POSE_INDEX)
+
+def index_pose(index: dict[str, list], lig_id: str, out_pose: Path, chash: str,
+               receptor_digest: str, score: float) -> None:
+    try:
+        st = os.stat(out_pose)
+    except OSError:
+        index.pop(lig_id, None)
+        return
+    index[lig_id] = [chash, receptor_digest, score, st.st_size, st.st_mtime_ns]
+
+def indexed_score(index: dict[str, list], lig_id: str, out_pose: Path, chash: str,
+                  receptor_digest: str) -> Optional[float]:
+    """Cached best score if the indexed pose is unchanged on disk for this config, else None."""
+    entry = index.get(lig_id)
+    if not entry or entry[0] != chash or entry[1] != receptor_digest:
+        return None
+    try:
+        st = os.stat(out_pose)
+    except OSError:
+        return None
+    if st.st_size != entry[3] or st.st_mtime_ns != entry[4]:
+        return None
+    return entry[2]
+
 def load_runtime_config(vina_path: Path, args) -> tuple[dict, dict, Path, str]:
     """
     Returns: (box, vcfg, receptor_path, config_hash)
@@ -205,7 +410,7 @@ def load_runtime_config(vina_path: Path, args) -> tuple[dict, dict, Path, str]:
         rec = Path(args.receptor).resolve() if args.receptor else DIR_REC_FALLBACK.resolve()
         if not rec.exists():
             raise SystemExit(f"❌ Receptor not found: {rec}")
-        chash = (args.config_hash or hashlib.sha1(json.dumps({"box": box, "vcfg": vcfg}, sort_keys=True).encode("utf-8")).hexdigest()[:10])
+        chash = args.config_hash or _cfg_hash(box, vcfg)
         print("Vina binary:", str(vina_path))
         print("Using docking params from CLI/run.yml (no static VinaConfig.txt dependency).")
         print("Box:", box)
@@ -239,7 +444,7 @@ def load_runtime_config(vina_path: Path, args) -> tuple[dict, dict, Path, str]:
             rec = DIR_REC_FALLBACK.resolve()
         if not rec.exists():
             raise SystemExit(f"❌ Receptor not found: {rec}")
-        chash = hashlib.sha1((cfg_path.read_text(encoding="utf-8")).encode("utf-8")).hexdigest()[:10]
+        chash = hashlib.new(DIGEST_ALGO, cfg_path.read_text(encoding="utf-8").encode("utf-8")).hexdigest()[:10]
         print("Vina binary:", str(vina_path))
         print("Using legacy VinaConfig.txt:", str(cfg_path))
         print("Box:", box)
@@ -252,120 +457,304 @@ def load_runtime_config(vina_path: Path, args) -> tuple[dict, dict, Path, str]:
     )
 
 # -------------- Vina helpers --------------
-VINA_RESULT_RE = re.compile(r"REMARK VINA RESULT:\s+(-?\d+\.\d+)", re.I)
+VINA_RESULT_PREFIX = b"REMARK VINA RESULT:"
 
-def vina_pose_is_valid(path: Path) -> tuple[bool, Optional[float]]:
+def vina_pose_is_valid(path: Path | str) -> tuple[bool, Optional[float]]:
+    """Scan the pose as raw byte lines (no decode) and track the best score."""
+    best: Optional[float] = None
     try:
-        if not path.exists() or path.stat().st_size < 200:
+        if os.stat(path).st_size < 200:
             return (False, None)
-        txt = path.read_text(errors="ignore")
-        scores = [float(m.group(1)) for m in VINA_RESULT_RE.finditer(txt)]
-        if not scores:
-            return (False, None)
-        return (True, min(scores))
-    except Exception:
+        with open(path, "rb") as f:
+            for raw in f:
+                if raw.startswith(VINA_RESULT_PREFIX):
+                    try:
+                        v = float(raw.split()[3])
+                    except (IndexError, ValueError):
+                        continue
+                    if best is None or v < best:
+                        best = v
+    except OSError:
         return (False, None)
+    return (best is not None, best)
+
+def tail_line(path: Path, start: int = 0, max_bytes: int = 4096) -> str:
+    """Last non-empty line after byte offset `start`, read from a small window at EOF."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(start, f.tell() - max_bytes))
+            chunk = f.read()
+    except OSError:
+        return ""
+    for line in reversed(chunk.decode("utf-8", errors="replace").splitlines()):
+        if line.strip():
+            return line.strip()
+    return ""
+
+def box_args(box: dict) -> list[str]:
+    args = []
+    for k in ("center_x", "center_y", "center_z", "size_x", "size_y", "size_z"):
+        args += [f"--{k}", str(box[k])]
+    return args
+
+def search_args(vcfg: dict) -> list[str]:
+    args = [
+        "--exhaustiveness", str(vcfg.get("exhaustiveness", 8)),
+        "--num_modes", str(vcfg.get("num_modes", 9)),
+        "--energy_range", str(vcfg.get("energy_range", 3)),
+    ]
+    if "seed" in vcfg:
+        args += ["--seed", str(vcfg["seed"])]
+    if "cpu" in vcfg:
+        args += ["--cpu", str(vcfg["cpu"])]
+    return args
+
+def run_logged(cmd: list[str], log: Path, box: dict) -> tuple[int, str]:
+    """Run cmd with stdout/stderr streamed into log; returns (rc, last output line)."""
+    log.parent.mkdir(parents=True, exist_ok=True)
+    with open(log, "w", encoding="utf-8") as f:
+        f.write("[BOX]\n"
+                f"center_x={box['center_x']} center_y={box['center_y']} center_z={box['center_z']}\n"
+                f"size_x={box['size_x']} size_y={box['size_y']} size_z={box['size_z']}\n\n")
+        f.write("[CMD]\n" + json.dumps(cmd, ensure_ascii=False) + "\n")  # argv as a JSON list
+        f.write("\n[OUTPUT]\n")
+        f.flush()
+        out_start = f.tell()
+        proc = subprocess.Popen(cmd, stdout=f, stderr=subprocess.STDOUT, start_new_session=True)
+        _CHILDREN.add(proc)
+        try:
+            rc = proc.wait()
+        finally:
+            _CHILDREN.discard(proc)
+
+    last = tail_line(log, start=out_start)
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(f"\nRC={rc}\n")
+    return rc, last
+
+def unlink_quiet(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
 
 def run_vina(vina_cmd: Path, receptor: Path, ligand_pdbqt: Path,
              out_pose: Path, out_log: Path, box: dict, vcfg: dict) -> tuple[bool, str]:
     """
     Run Vina producing out_pose.tmp, then atomically rename to out_pose.
-    We DO NOT pass --log (some builds lack it). We capture stdout/stderr.
+    We DO NOT pass --log (some builds lack it). stdout/stderr go straight to out_log.
     """
-    ligand_pdbqt = ligand_pdbqt.resolve()
-    out_pose = out_pose.resolve()
     out_pose.parent.mkdir(parents=True, exist_ok=True)
-    tmp_pose = out_pose.with_suffix(".pdbqt.tmp")
+    dst = os.fspath(out_pose)
+    tmp = dst + ".tmp"
 
     # Clean stale outputs
-    for p in (out_pose, tmp_pose, out_log):
-        try:
-            if Path(p).exists(): Path(p).unlink()
-        except Exception:
-            pass
+    for p in (dst, tmp, os.fspath(out_log)):
+        unlink_quiet(p)
 
     cmd = [
         str(vina_cmd),
         "--receptor", str(receptor),
         "--ligand", str(ligand_pdbqt),
-        "--center_x", str(box["center_x"]),
-        "--center_y", str(box["center_y"]),
-        "--center_z", str(box["center_z"]),
-        "--size_x", str(box["size_x"]),
-        "--size_y", str(box["size_y"]),
-        "--size_z", str(box["size_z"]),
-        "--exhaustiveness", str(vcfg.get("exhaustiveness", 8)),
-        "--num_modes", str(vcfg.get("num_modes", 9)),
-        "--energy_range", str(vcfg.get("energy_range", 3)),
-        "--out", str(tmp_pose)
+        *box_args(box),
+        *search_args(vcfg),
+        "--out", tmp
     ]
-    if "seed" in vcfg:
-        cmd += ["--seed", str(vcfg["seed"])]
-    if "cpu" in vcfg:
-        cmd += ["--cpu", str(vcfg["cpu"])]
 
-    # Run Vina and capture output to our own log
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    out, err = proc.communicate()
+    # Run Vina with stdout/stderr streamed straight into our own log (no pipes)
+    rc, last = run_logged(cmd, out_log, box)
 
-    with open(out_log, "w", encoding="utf-8") as f:
-        f.write("[BOX]\n"
-                f"center_x={box['center_x']} center_y={box['center_y']} center_z={box['center_z']}\n"
-                f"size_x={box['size_x']} size_y={box['size_y']} size_z={box['size_z']}\n\n")
-        f.write("[CMD]\n" + " ".join(shlex.quote(c) for c in cmd) + "\n")
-        f.write("\n[STDOUT]\n" + (out or "") + "\n")
-        f.write("\n[STDERR]\n" + (err or "") + f"\nRC={proc.returncode}\n")
-
-    if proc.returncode != 0:
-        try:
-            if tmp_pose.exists(): tmp_pose.unlink()
-        except Exception:
-            pass
-        last = (err or out or f"Vina rc={proc.returncode}").strip().splitlines()[-1][:300]
-        return (False, last)
+    if rc != 0:
+        unlink_quiet(tmp)
+        return (False, (last or f"Vina rc={rc}")[:300])
 
-    ok, _ = vina_pose_is_valid(tmp_pose)
+    ok, _ = vina_pose_is_valid(tmp)
     if not ok:
-        try:
-            if tmp_pose.exists(): tmp_pose.unlink()
-        except Exception:
-            pass
-        last = (err or out or "Invalid/empty Vina pose").strip().splitlines()[-1][:300]
-        return (False, last)
+        unlink_quiet(tmp)
+        return (False, (last or "Invalid/empty Vina pose")[:300])
 
-    tmp_pose.replace(out_pose)
+    os.replace(tmp, dst)
     return (True, "OK")
 
+def stage_receptor(receptor: Path) -> Path:
+    """
+    Copy the receptor once into RAM-backed temp storage (/dev/shm on Linux, the
+    temp dir elsewhere) so every Vina process reads it from memory rather than
+    from a slow or network project disk. Falls back to the original path.
+    """
+    shm = Path("/dev/shm")
+    tmp_dir = shm if shm.is_dir() and os.access(shm, os.W_OK) else Path(tempfile.gettempdir())
+    try:
+        fd, name = tempfile.mkstemp(prefix="moldock_receptor_", suffix=".pdbqt", dir=tmp_dir)
+        with os.fdopen(fd, "wb") as dst, open(receptor, "rb") as src:
+            shutil.copyfileobj(src, dst, 1<<20)
+    except OSError:
+        return receptor
+    return Path(name)
+
+def prepare_vina_maps(vina_cmd: Path, receptor: Path, box: dict, maps_dir: Path) -> Optional[Path]:
+    """
+    Write the receptor grid maps once (Vina >= 1.2 --write_maps) and return the map prefix.
+    Returns None when this Vina build cannot write maps, so callers dock per ligand.
+    """
+    prefix = maps_dir / "receptor"
+    marker = maps_dir / ".complete"
+    if marker.exists():
+        return prefix
+    maps_dir.mkdir(parents=True, exist_ok=True)
+    cmd = [str(vina_cmd), "--receptor", str(receptor), *box_args(box),
+           "--write_maps", str(prefix), "--force_even_voxels"]
+    rc, _ = run_logged(cmd, maps_dir / "write_maps.log", box)
+    if rc != 0:
+        return None
+    marker.touch()
+    return prefix
+
+def run_vina_batch(vina_cmd: Path, maps: Path, ligand_paths: list[Path], out_dir: Path,
+                   out_log: Path, box: dict, vcfg: dict) -> tuple[int, str]:
+    """Dock a group of ligands in one Vina process against precomputed maps."""
+    cmd = [str(vina_cmd), "--maps", str(maps),
+           "--batch", *(str(PREP_ABS / p.name) for p in ligand_paths),
+           "--dir", str(out_dir), *search_args(vcfg)]
+    return run_logged(cmd, out_log, box)
+
+def group_ligands(ligs: list[Path], size: int, max_chars: int) -> Iterator[list[Path]]:
+    """Yield groups of at most `size` ligands whose paths fit in `max_chars` of argv."""
+    group: list[Path] = []
+    chars = 0
+    for lig in ligs:
+        n = len(str(PREP_ABS / lig.name)) + 1
+        if group and (len(group) >= size or chars + n > max_chars):
+            yield group
+            group, chars = [], 0
+        group.append(lig)
+        chars += n
+    if group:
+        yield group
+
 # -------------- Summary builders --------------
+SUMMARY_HEADERS = ["id","inchikey","vina_score","pose_path","created_at"]
+LEADER_HEADERS = ["rank","id","inchikey","vina_score","pose_path"]
+
+def rank_by_score(entries: list[tuple]) -> list[tuple]:
+    """(id, inchikey, vina_score, pose) entries by ascending score; ties keep input (id) order."""
+    if np is None or len(entries) < NUMPY_RANK_MIN:
+        return sorted(entries, key=lambda e: float(e[2]))
+    scores = np.fromiter((float(e[2]) for e in entries), dtype=np.float64, count=len(entries))
+    return [entries[i] for i in np.argsort(scores, kind="stable")]
+
 def build_and_write_summaries_from_manifest(manifest: dict[str, dict]) -> None:
-    # Summary
-    summary_headers = ["id","inchikey","vina_score","pose_path","created_at"]
-    summary_rows = []
-    for _, m in sorted(manifest.items()):
-        sc = m.get("vina_score","")
-        if sc:
-            summary_rows.append({
-                "id": m.get("id",""),
-                "inchikey": m.get("inchikey",""),
-                "vina_score": sc,
-                "pose_path": m.get("vina_pose",""),
-                "created_at": m.get("updated_at","")
-            })
-    write_csv(FILE_SUMMARY, summary_rows, summary_headers)
+    # Summary: streamed straight to disk; only the leaderboard fields are kept for ranking
+    entries: list[tuple] = []
+
+    def summary_rows():
+        for _, m in sorted(manifest.items()):
+            sc = m.get("vina_score","")
+            if sc:
+                e = (m.get("id",""), m.get("inchikey",""), sc, m.get("vina_pose",""))
+                entries.append(e)
+                yield (*e, m.get("updated_at",""))
+
+    write_rows(FILE_SUMMARY, SUMMARY_HEADERS, summary_rows())
 
     # Leaderboard
-    leader_headers = ["rank","id","inchikey","vina_score","pose_path"]
-    ranked = sorted(summary_rows, key=lambda r: float(r["vina_score"])) if summary_rows else []
-    leader_rows = []
-    for i, r in enumerate(ranked, 1):
-        leader_rows.append({
-            "rank": i,
-            "id": r["id"],
-            "inchikey": r["inchikey"],
-            "vina_score": r["vina_score"],
-            "pose_path": r["pose_path"]
-        })
-    write_csv(FILE_LEADER, leader_rows, leader_headers)
+    write_rows(FILE_LEADER, LEADER_HEADERS,
+               ((i, *e) for i, e in enumerate(rank_by_score(entries), 1)))
+
+SKIP_LOG = b"[SKIP] Existing valid pose kept (same receptor+config)\n"
+
+def write_skip_log(out_log: Path) -> None:
+    """Write the [SKIP] marker unless the log already is one (no rewrite on every re-run)."""
+    try:
+        if os.stat(out_log).st_size == len(SKIP_LOG):
+            return
+    except OSError:
+        pass
+    with open(out_log, "wb") as f:
+        f.write(SKIP_LOG)
+
+# -------------- Worker --------------
+def dock_one(lig: Path, vina_bin: Path, receptor: Path, box: dict, vcfg: dict,
+             chash: str, receptor_digest: str) -> dict:
+    """
+    Dock one ligand in a worker process.
+    Returns the manifest fields to merge for this ligand (the parent owns the manifest).
+    """
+    lig_id = lig.stem
+    out_pose = RES_ABS / f"{lig_id}_out.pdbqt"
+    out_log  = RES_ABS / f"{lig_id}_vina.log"
+
+    ok, reason = run_vina(vina_bin, receptor, lig, out_pose, out_log, box, vcfg)
+    return vina_result(lig, out_pose, ok, reason, vina_bin, chash, receptor_digest)
+
+def vina_result(lig: Path, out_pose: Path, ok: bool, reason: str, vina_bin: Path,
+                chash: str, receptor_digest: str) -> dict:
+    lig_id = lig.stem
+    m = {
+        "id": lig_id,
+        "pdbqt_path": str(PREP_ABS / lig.name),
+        "vina_status": "DONE" if ok else "FAILED",
+        "vina_pose": str(out_pose),
+        "vina_reason": "OK" if ok else reason,
+        "config_hash": chash,
+        "receptor_digest": receptor_digest,
+        "tools_vina": str(vina_bin),
+        "updated_at": now_iso(),
+    }
+    if ok:
+        ok2, best_score = vina_pose_is_valid(out_pose)
+        if ok2 and best_score is not None:
+            m["vina_score"] = f"{best_score:.2f}"
+        else:
+            m["vina_status"] = "FAILED"
+            m["vina_reason"] = "Pose written but invalid"
+    return m
+
+def dock_group(ligs: list[Path], vina_bin: Path, receptor: Path, maps: Optional[Path],
+               box: dict, vcfg: dict, chash: str, receptor_digest: str) -> list[dict]:
+    """
+    Dock a group of ligands in a worker process via Vina --batch runs.
+    Vina aborts a batch at the first ligand it cannot dock: that ligand is
+    docked alone (for an exact failure reason) and the rest are re-batched.
+    """
+    if maps is None:
+        return [dock_one(lig, vina_bin, receptor, box, vcfg, chash, receptor_digest) for lig in ligs]
+
+    stage = DIR_RESULTS / "_batch_tmp" / ligs[0].stem
+    results = []
+    remaining = list(ligs)
+    while remaining:
+        shutil.rmtree(stage, ignore_errors=True)
+        stage.mkdir(parents=True, exist_ok=True)
+        batch_log = RES_ABS / "batch_logs" / f"{remaining[0].stem}.log"
+        rc, _ = run_vina_batch(vina_bin, maps, remaining, stage, batch_log, box, vcfg)
+
+        missing = []
+        for lig in remaining:
+            lig_id = lig.stem
+            out_pose = RES_ABS / f"{lig_id}_out.pdbqt"
+            staged = stage / f"{lig_id}_out.pdbqt"
+            if not vina_pose_is_valid(staged)[0]:
+                missing.append(lig)
+                continue
+            os.replace(staged, out_pose)
+            with open(DIR_RESULTS / f"{lig_id}_vina.log", "w", encoding="utf-8") as f:
+                f.write(f"[BATCH] Docked via --maps/--batch; group log: {batch_log}\nRC={rc}\n")
+            results.append(vina_result(lig, out_pose, True, "OK", vina_bin, chash, receptor_digest))
+
+        if not missing:
+            break
+        first = dock_one(missing[0], vina_bin, receptor, box, vcfg, chash, receptor_digest)
+        results.append(first)
+        if len(missing) == len(remaining) and first["vina_status"] == "DONE":
+            # No progress, yet the first ligand docks fine alone: stop batching this group.
+            results += [dock_one(lig, vina_bin, receptor, box, vcfg, chash, receptor_digest)
+                        for lig in missing[1:]]
+            break
+        remaining = missing[1:]
+    shutil.rmtree(stage, ignore_errors=True)
+    return results
 
 # -------------- Main --------------
 def main() -> int:
@@ -386,95 +775,164 @@ def main() -> int:
 
     vina_bin = find_vina_binary(args.vina)
     box, vcfg, receptor, chash = load_runtime_config(vina_bin, args)
+    # Intra-ligand threads only; does not affect the config hash computed above.
+    vcfg["cpu"] = CORES_PER_JOB
 
-    ligs = sorted(DIR_PREP.glob("*.pdbqt"))
     only_ids_fn = globals().get("only_ids_from_env")
     only_ids = only_ids_fn() if callable(only_ids_fn) else None
-    if only_ids is not None:
-        ligs = [lig for lig in ligs if lig.stem in only_ids]
+    # Sorted for deterministic submission order; filter before sorting.
+    ligs = sorted(lig for lig in iter_ligands(DIR_PREP)
+                  if only_ids is None or lig.stem in only_ids)
     if not ligs:
         raise SystemExit("❌ No ligand PDBQTs found in prepared_ligands/. Run Module 3 first.")
 
-    receptor_sha1 = sha1_of_file(receptor)
+    # Reuse the last run's receptor digest while the file is untouched
+    prev = load_current_config()
+    rec_st = receptor.stat()
+    cur = {"receptor": str(receptor), "receptor_size": rec_st.st_size,
+           "receptor_mtime_ns": rec_st.st_mtime_ns, "digest": DIGEST_ALGO}
+    if all(prev.get(k) == v for k, v in cur.items()) and prev.get("receptor_digest"):
+        receptor_digest = prev["receptor_digest"]
+    else:
+        receptor_digest = digest_of_file(receptor)
+    save_current_config({**cur, "config_hash": chash, "receptor_digest": receptor_digest})
     manifest = load_manifest()
+    pose_index = load_pose_index()
+    # Rows stamped before the SHA-256 switch carry a 40-char SHA-1; accept it so they are not redocked.
+    receptor_ids = {receptor_digest}
+    if any(len(m.get("receptor_digest", "")) == 40 for m in manifest.values()):
+        receptor_ids.add(digest_of_file(receptor, "sha1"))
+    # (config_hash, receptor digest) pairs that mark a row as docked under the current setup
+    current_keys = {(chash, rid) for rid in receptor_ids}
     created_ts = now_iso()
     done = failed = 0
+    processed = 0
+    work_receptor = receptor
 
     try:
-        for idx, lig in enumerate(ligs, 1):
-            if STOP_REQUESTED or HARD_STOP:
-                print("🧾 Stop requested — finalizing after this checkpoint...")
-                break
-
+        # ---- IDEMPOTENCY CHECKS (parent) ----
+        todo: list[Path] = []
+        for lig in ligs:
             lig_id = lig.stem
-            out_pose = (DIR_RESULTS / f"{lig_id}_out.pdbqt").resolve()
-            out_log  = (DIR_RESULTS / f"{lig_id}_vina.log").resolve()
+            out_pose = RES_ABS / f"{lig_id}_out.pdbqt"
+            out_log  = RES_ABS / f"{lig_id}_vina.log"
 
-            # ---- IDEMPOTENCY CHECKS ----
-            m = manifest.get(lig_id, {k: "" for k in MANIFEST_FIELDS})
+            m = manifest.get(lig_id) or _EMPTY.copy()
             m.setdefault("id", lig_id)
             m.setdefault("created_at", created_ts)
 
-            has_valid_pose, best_existing = vina_pose_is_valid(out_pose)
-            same_cfg = (m.get("config_hash") == chash) and (m.get("receptor_sha1") == receptor_sha1)
+            same_cfg = (m.get("config_hash"), m.get("receptor_digest")) in current_keys
             already_done = (m.get("vina_status") == "DONE")
+            # A stat() against the pose index replaces re-reading unchanged poses
+            best_existing = indexed_score(pose_index, lig_id, out_pose, chash, receptor_digest)
+            if best_existing is not None:
+                has_valid_pose = True
+            else:
+                has_valid_pose, best_existing = vina_pose_is_valid(out_pose)
+                if has_valid_pose and already_done and same_cfg and best_existing is not None:
+                    index_pose(pose_index, lig_id, out_pose, chash, receptor_digest, best_existing)
 
             if has_valid_pose and already_done and same_cfg:
                 # Keep existing result; repair/ensure manifest fields
                 if best_existing is not None and not m.get("vina_score"):
                     m["vina_score"] = f"{best_existing:.2f}"
                 m["vina_pose"] = str(out_pose)
-                m["pdbqt_path"] = str(lig.resolve())
+                m["pdbqt_path"] = str(PREP_ABS / lig.name)
                 m["tools_vina"] = str(vina_bin)
+                m["receptor_digest"] = receptor_digest
                 m["updated_at"] = now_iso()
                 manifest[lig_id] = m
 
                 # Minimal log for transparency
-                out_log.parent.mkdir(parents=True, exist_ok=True)
-                with open(out_log, "w", encoding="utf-8") as f:
-                    f.write("[SKIP] Existing valid pose kept (same receptor+config)\n")
-
-                # Periodic checkpoint
-                if idx % 50 == 0:
-                    save_manifest(manifest)
-                    build_and_write_summaries_from_manifest(manifest)
+                write_skip_log(out_log)
                 continue
-            # ---- END IDEMPOTENCY CHECKS ----
-
-            # Fresh docking (or re-docking due to changed config/receptor or invalid/missing pose)
-            ok, reason = run_vina(vina_bin, receptor, lig, out_pose, out_log, box, vcfg)
-
-            m["pdbqt_path"] = str(lig.resolve())
-            m["vina_status"] = "DONE" if ok else "FAILED"
-            m["vina_pose"] = str(out_pose)
-            m["vina_reason"] = "OK" if ok else reason
-            m["config_hash"] = chash
-            m["receptor_sha1"] = receptor_sha1
-            m["tools_vina"] = str(vina_bin)
-            m["updated_at"] = now_iso()
-
-            if ok:
-                ok2, best_score = vina_pose_is_valid(out_pose)
-                if ok2 and best_score is not None:
-                    m["vina_score"] = f"{best_score:.2f}"
-                    done += 1
-                else:
-                    m["vina_status"] = "FAILED"
-                    m["vina_reason"] = "Pose written but invalid"
-                    failed += 1
-            else:
-                failed += 1
-
-            manifest[lig_id] = m
-
-            # periodic checkpoint
-            if idx % 50 == 0:
-                save_manifest(manifest)
-                build_and_write_summaries_from_manifest(manifest)
+            todo.append(lig)
+        # ---- END IDEMPOTENCY CHECKS ----
+
+        # Vina processes read the receptor from one RAM-backed copy (see stage_receptor)
+        work_receptor = stage_receptor(receptor) if todo else receptor
+
+        maps = None
+        if todo and VINA_BATCH_SIZE > 0:
+            maps = prepare_vina_maps(vina_bin, work_receptor, box,
+                                     DIR_STATE / "vina_maps" / f"{chash}_{receptor_digest[:10]}")
+            if maps is None:
+                print("⚠️ Vina could not write grid maps (needs >= 1.2); docking one ligand per process.")
+        group_size = VINA_BATCH_SIZE if maps is not None else 1
+        groups = list(group_ligands(todo, group_size, VINA_BATCH_MAX_ARGV))
+        if todo:
+            print(f"🧵 Parallel Vina: jobs={N_JOBS} cpu/job={CORES_PER_JOB} ligands={len(todo)} "
+                  f"groups={len(groups)}")
+
+        # Fresh docking (or re-docking due to changed config/receptor or invalid/missing pose)
+        executor = ProcessPoolExecutor(max_workers=N_JOBS, initializer=_worker_init)
+        cancelled = False
+        try:
+            futures = {
+                executor.submit(dock_group, group, vina_bin, work_receptor, maps, box, vcfg, chash, receptor_digest): group
+                for group in groups
+            }
+            pending = set(futures)
+            while pending:
+                if HARD_STOP:
+                    # Running groups are abandoned; their manifest rows stay as they were.
+                    print("🧾 Hard stop — terminating workers and their Vina processes...")
+                    _terminate_workers(executor)
+                    break
+                if STOP_REQUESTED and not cancelled:
+                    print("🧾 Stop requested — cancelling queued ligands, finishing running ones...")
+                    # Only queued futures can be cancelled; running ligands finish cleanly.
+                    # (Cancelled futures never notify waiters, so drop them here.)
+                    pending = {f for f in pending if not f.cancel()}
+                    cancelled = True
+                    if not pending:
+                        break
+
+                finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    group = futures[fut]
+                    try:
+                        updates = fut.result()
+                    except Exception as e:
+                        # A worker crashed before returning
+                        updates = [{
+                            "id": lig.stem,
+                            "vina_status": "FAILED",
+                            "vina_reason": f"Worker error: {e}"[:300],
+                            "updated_at": now_iso(),
+                        } for lig in group]
+                    for upd in updates:
+                        lig_id = upd["id"]
+                        m = manifest.get(lig_id) or _EMPTY.copy()
+                        m.setdefault("created_at", created_ts)
+                        m.update(upd)
+                        manifest[lig_id] = m
+                        append_manifest_delta({"created_at": m["created_at"], **upd})
+                        if m.get("vina_status") == "DONE" and m.get("vina_score"):
+                            index_pose(pose_index, lig_id, Path(m["vina_pose"]), chash, receptor_digest,
+                                       float(m["vina_score"]))
+                        else:
+                            pose_index.pop(lig_id, None)
+
+                        if m.get("vina_status") == "DONE":
+                            done += 1
+                        else:
+                            failed += 1
+
+                        # periodic checkpoint (the manifest itself is kept current by the delta log)
+                        processed += 1
+                        if processed % CHECKPOINT_EVERY == 0:
+                            build_and_write_summaries_from_manifest(manifest)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            shutil.rmtree(DIR_RESULTS / "_batch_tmp", ignore_errors=True)
 
     finally:
+        if work_receptor != receptor:
+            unlink_quiet(os.fspath(work_receptor))
         # Always flush outputs (even on Ctrl+C/exception)
-        save_manifest(manifest)
+        compact_manifest(manifest)
+        save_pose_index(pose_index)
         build_and_write_summaries_from_manifest(manifest)
         print(f"✅ Docking complete (or stopped). DONE: {done}  FAILED: {failed}")
         print(f"   Summary: {FILE_SUMMARY}")
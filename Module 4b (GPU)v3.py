@@ -2,19 +2,49 @@
 # Module 4b (GPU) — Mini-batch with idempotent resume + graceful stop + atom-type validation
 
 from __future__ import annotations
-import argparse, csv, hashlib, os, re, shlex, shutil, signal, subprocess
+import argparse, collections, csv, hashlib, heapq, itertools, json, mmap, operator, os, re, shlex, shutil, signal, subprocess, threading, time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, Optional, Tuple, Iterable
+from typing import Dict, Optional, Tuple, Iterable, Iterator, Sequence
+try:
+    import numpy as np  # optional: faster ranking of very large leaderboards
+except Exception:
+    np = None
 
 # ------------ Tunables ------------
-BATCH_SIZE = 64
+BATCH_SIZE = 64  # floor; raised to fit free VRAM when nvidia-smi is available
+BATCH_SIZE_MAX = 1024
+VRAM_PER_LIGAND_MB = 40  # rough per-ligand footprint used to size batches; tune per card
+VRAM_TARGET_FRACTION = 0.7
+SUMMARY_EVERY = 16  # rebuild summary/leaderboard every N batches (and once at the end)
+CHECKPOINT_TOP_K = 1000  # mid-run leaderboards list only the best K; the final one is complete
+STAGE_MODE = "hardlink"  # how ligands enter a batch dir: "hardlink" | "symlink" | "copy"
 SAFE_RESUME = True
 KEEP_TMP = False
+NUMPY_RANK_MIN = 10_000  # leaderboards this long use numpy.argsort (if available)
+VALIDATE_THREADS = min(32, (os.cpu_count() or 1) * 2)  # small libraries: I/O bound, threads suffice
+VALIDATE_PROCESS_MIN = 2000  # larger libraries: the regex scan holds the GIL, use processes
+HARVEST_THREADS = min(8, os.cpu_count() or 1)  # pose parsing, overlapped with the next GPU batch
+NUM_GPUS = 1  # concurrent batches, one per device; MOLDOCK_NUM_GPUS overrides it in main()
 # ----------------------------------
 
 STOP_REQUESTED = False
 HARD_STOP = False
+_CHILDREN: set[subprocess.Popen] = set()  # Vina-GPU runs in its own session; reaped on 2nd Ctrl+C
+KILL_GRACE_S = 5.0
+def _signal_children(sig:int) -> None:
+    for proc in list(_CHILDREN):
+        try:
+            if os.name == "posix": os.killpg(proc.pid, sig)
+            elif sig == signal.SIGTERM: proc.terminate()
+            else: proc.kill()
+        except OSError: pass
+def _kill_children() -> None:
+    if not _CHILDREN: return
+    _signal_children(signal.SIGTERM)
+    t = threading.Timer(KILL_GRACE_S, _signal_children, args=(getattr(signal, "SIGKILL", signal.SIGTERM),))
+    t.daemon = True; t.start()
 def _sigint(_, __):
     global STOP_REQUESTED, HARD_STOP
     if not STOP_REQUESTED:
@@ -22,7 +52,8 @@ def _sigint(_, __):
         print("\n⏹️  Ctrl+C — finishing current batch then exiting cleanly…")
     else:
         HARD_STOP = True
-        print("\n⏭️  Second Ctrl+C — will exit ASAP after harvest.")
+        print("\n⏭️  Second Ctrl+C — stopping Vina-GPU, then harvesting what finished.")
+        _kill_children()
 signal.signal(signal.SIGINT, _sigint)
 
 BASE = Path(".").resolve()
@@ -32,6 +63,9 @@ DIR_STATE  = BASE / "state"
 DIR_REC_FALLBACK = BASE / "receptors" / "target_prepared.pdbqt"
 
 FILE_MANIFEST = DIR_STATE / "manifest.csv"
+FILE_MANIFEST_DELTA = DIR_STATE / "manifest.jsonl"  # per-batch updates, folded into the CSV at exit
+FILE_DIGEST_CACHE = DIR_STATE / "digest_cache.json"  # file digests keyed by path/size/mtime/algorithm
+FILE_VALIDATION_CACHE = DIR_STATE / "validation_cache.json"  # path -> [size, mtime_ns, ok, why]
 FILE_SUMMARY  = DIR_RESULTS / "summary.csv"
 FILE_LEADER   = DIR_RESULTS / "leaderboard.csv"
 
@@ -50,22 +84,79 @@ def only_ids_from_env() -> set[str] | None:
         return set()
     return {ln.strip() for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()}
 
-def read_csv(path: Path)->list[dict]:
-    if not path.exists(): return []
+def num_gpus_from_env() -> int:
+    raw = os.environ.get("MOLDOCK_NUM_GPUS", "").strip()
+    if not raw:
+        return NUM_GPUS
+    try:
+        n = int(raw)
+    except ValueError:
+        n = 0
+    if n < 1:
+        raise SystemExit(f"❌ MOLDOCK_NUM_GPUS must be a positive integer (got {raw!r}).")
+    return n
+
+def iter_ligands(root: Path)->Iterator[Path]:
+    with os.scandir(root) as it:
+        for e in it:
+            if e.name.endswith(".pdbqt") and e.is_file(): yield Path(e.path)
+
+POSE_SUFFIX = "_out.pdbqt"
+def docked_stems(out_dir: Path)->set[str]:
+    """Stems with a pose in out_dir, from one directory listing (no per-ligand stat)."""
+    with os.scandir(out_dir) as it:
+        return {e.name[:-len(POSE_SUFFIX)] for e in it if e.name.endswith(POSE_SUFFIX)}
+
+def read_rows(path: Path, fields: Sequence[str])->Iterator[dict]:
+    """Stream CSV rows projected onto `fields` in one csv.reader pass ("" for absent columns)."""
+    if not path.exists(): return
     with path.open("r", newline="", encoding="utf-8") as f:
-        return [dict(r) for r in csv.DictReader(f)]
-
-def write_csv(path: Path, rows: list[dict], headers: list[str])->None:
+        r=csv.reader(f); header=next(r, None)
+        if header is None: return
+        pad=len(header)  # absent columns read this always-empty slot
+        pos={name:i for i,name in reversed(list(enumerate(header)))}
+        for old,new in RENAMED_FIELDS.items():
+            if old in pos: pos.setdefault(new, pos[old])
+        get=operator.itemgetter(*(pos.get(k, pad) for k in fields))
+        for row in r:
+            if not row: continue
+            row+=[""]*(pad+1-len(row))
+            yield dict(zip(fields, get(row)))
+
+def write_rows(path: Path, headers: list[str], rows: Iterable[Sequence])->None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=headers); w.writeheader()
-        for r in rows: w.writerow({k: r.get(k,"") for k in headers})
+    tmp = path.with_name(path.name + ".tmp")  # readers never see a half-written CSV
+    with tmp.open("w", newline="", encoding="utf-8", buffering=1<<20) as f:
+        w = csv.writer(f); w.writerow(headers); w.writerows(rows)
+    os.replace(tmp, path)
+
+# SHA-256 runs on the CPU's SHA extensions via OpenSSL where available.
+DIGEST_ALGO = "sha256" if "sha256" in hashlib.algorithms_guaranteed else "sha1"
 
-def sha1_of_file(p: Path)->str:
-    h=hashlib.sha1()
+def digest_of_file(p: Path, algo: str = DIGEST_ALGO)->str:
     with p.open("rb") as f:
-        for chunk in iter(lambda:f.read(1<<20), b""): h.update(chunk)
-    return h.hexdigest()
+        if hasattr(hashlib, "file_digest"): return hashlib.file_digest(f, algo).hexdigest()
+        h=hashlib.new(algo)
+        if os.fstat(f.fileno()).st_size:  # mmap rejects empty files
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm: h.update(mm)
+        return h.hexdigest()
+
+def cached_digest(p: Path, algo: str = DIGEST_ALGO)->str:
+    """digest_of_file, memoized in state/digest_cache.json until p's size or mtime changes."""
+    rp = p.resolve(); st = rp.stat()
+    key = f"{rp}:{st.st_size}:{st.st_mtime_ns}:{algo}"
+    try: cache = json.loads(FILE_DIGEST_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError): cache = {}
+    if key in cache: return cache[key]
+    digest = digest_of_file(p, algo)
+    # One entry per file: drop digests of older versions of the same path
+    prefix = f"{rp}:"
+    cache = {k:v for k,v in cache.items() if not k.startswith(prefix)}
+    cache[key] = digest
+    tmp = FILE_DIGEST_CACHE.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+    os.replace(tmp, FILE_DIGEST_CACHE)
+    return digest
 
 MANIFEST_FIELDS = [
     "id","smiles","inchikey",
@@ -73,43 +164,110 @@ MANIFEST_FIELDS = [
     "sdf_status","sdf_path","sdf_reason",
     "pdbqt_status","pdbqt_path","pdbqt_reason",
     "vina_status","vina_score","vina_pose","vina_reason",
-    "config_hash","receptor_sha1","tools_rdkit","tools_meeko","tools_vina",
+    "config_hash","receptor_digest","tools_rdkit","tools_meeko","tools_vina",
     "created_at","updated_at"
 ]
+_EMPTY={k:"" for k in MANIFEST_FIELDS}  # template for new rows; always .copy()
+RENAMED_FIELDS={"receptor_sha1":"receptor_digest"}  # old column name -> current, for older manifests
 def load_manifest()->dict[str,dict]:
-    if not FILE_MANIFEST.exists(): return {}
-    out={}
-    for r in read_csv(FILE_MANIFEST):
-        row={k:r.get(k,"") for k in MANIFEST_FIELDS}; out[row["id"]]=row
+    out={row["id"]:row for row in read_rows(FILE_MANIFEST, MANIFEST_FIELDS)}
+    # Replay updates a previous run (of 4a or 4b) logged but never compacted
+    if FILE_MANIFEST_DELTA.exists():
+        with open(FILE_MANIFEST_DELTA, "r", encoding="utf-8") as f:
+            for line in f:
+                try: delta=json.loads(line)
+                except ValueError: continue  # torn last line
+                for old,new in RENAMED_FIELDS.items():
+                    if old in delta: delta.setdefault(new, delta.pop(old))
+                row=out.setdefault(delta["id"], _EMPTY.copy())
+                row.update({k:v for k,v in delta.items() if k in MANIFEST_FIELDS})
     return out
+_MANIFEST_ROW=operator.itemgetter(*MANIFEST_FIELDS)  # rows are always full (padded on load, _EMPTY when new)
 def save_manifest(m:dict[str,dict])->None:
-    rows=[{k:v.get(k,"") for k in MANIFEST_FIELDS} for _,v in sorted(m.items())]
-    write_csv(FILE_MANIFEST, rows, MANIFEST_FIELDS)
+    write_rows(FILE_MANIFEST, MANIFEST_FIELDS, (_MANIFEST_ROW(v) for _,v in sorted(m.items())))
+# Fields this module owns. Only these go to the delta log, so replaying it after
+# Modules 1-3 rewrote manifest.csv cannot revert their smiles/admet/sdf/pdbqt columns.
+DELTA_FIELDS=("id","pdbqt_path","vina_status","vina_score","vina_pose","vina_reason",
+              "config_hash","receptor_digest","tools_vina","created_at","updated_at")
+_DELTA_ROW=operator.itemgetter(*DELTA_FIELDS)
+def append_manifest_deltas(m:dict[str,dict], ids:Iterable[str])->None:
+    """Append only the rows touched since the last checkpoint: O(batch), not O(manifest)."""
+    DIR_STATE.mkdir(parents=True, exist_ok=True)
+    with open(FILE_MANIFEST_DELTA, "a", encoding="utf-8") as f:
+        f.writelines(json.dumps(dict(zip(DELTA_FIELDS, _DELTA_ROW(m[i])))) + "\n" for i in ids)
+def compact_manifest(m:dict[str,dict])->None:
+    save_manifest(m)
+    FILE_MANIFEST_DELTA.unlink(missing_ok=True)
 
 # --- Atom-type validation ---
-ALLOWED_AD4_TYPES = {
+ALLOWED_AD4_TYPES = frozenset({
     "C","A","N","O","S","H","P","F","Cl","Br","I",
     "HD","NA","OA","SA",
     "Zn","Fe","Mg","Mn","Ca","Cu","Ni","Co","K","Na"
-}
+})
 
-def get_pdbqt_atom_types(path: Path) -> set[str]:
-    types=set()
+ALLOWED_AD4_TYPES_B = frozenset(t.encode() for t in ALLOWED_AD4_TYPES)
+
+# Last whitespace-separated token of every ATOM/HETATM line (the AD4 type). The
+# greedy [^\n]* runs to end of line and backs off to the last blank, instead of
+# retrying (\S+) at every column as a lazy scan would.
+PDBQT_ATOMLINE = re.compile(rb"(?m)^(?:ATOM|HETATM)[^\n]*[ \t](\S+)[ \t\r]*$")
+
+def get_pdbqt_atom_types(path: Path) -> set[bytes]:
+    # Ligand PDBQTs are a few KB: one unbuffered read beats mmap setup, and the
+    # C regex scan beats any per-line Python (or numpy line-splitting) pass.
     try:
-        for line in path.read_text(errors="ignore").splitlines():
-            if line.startswith(("ATOM","HETATM")):
-                toks=line.split()
-                if toks: types.add(toks[-1])
-    except Exception:
-        pass
-    return types
+        with open(path, "rb", buffering=0) as f:
+            return set(PDBQT_ATOMLINE.findall(f.read()))
+    except OSError:
+        return set()
 
 def pdbqt_has_only_allowed_types(path: Path) -> tuple[bool,str]:
     ts=get_pdbqt_atom_types(path)
-    bad=[t for t in ts if t not in ALLOWED_AD4_TYPES]
-    if bad:
-        return False,"Unsupported AD4 atom types: "+",".join(sorted(set(bad)))
-    return True,"OK"
+    if ts<=ALLOWED_AD4_TYPES_B:  # subset test stops at the first unknown type
+        return True,"OK"
+    bad=ts-ALLOWED_AD4_TYPES_B
+    return False,"Unsupported AD4 atom types: "+",".join(sorted(t.decode(errors="replace") for t in bad))
+
+def _validate_one(lig: Path) -> tuple[Path, bool, str]:
+    return (lig, *pdbqt_has_only_allowed_types(lig))
+
+def _validate_worker_init() -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is handled by the parent
+
+def _check_types(ligs: list[Path]) -> list[tuple[Path, bool, str]]:
+    ncpu = os.cpu_count() or 1
+    if ncpu > 1 and len(ligs) >= VALIDATE_PROCESS_MIN:
+        with ProcessPoolExecutor(max_workers=ncpu, initializer=_validate_worker_init) as ex:
+            return list(ex.map(_validate_one, ligs, chunksize=64))
+    with ThreadPoolExecutor(max_workers=VALIDATE_THREADS) as ex:
+        return list(ex.map(_validate_one, ligs))
+
+def validate_ligands(ligs: Iterable[Path]) -> list[tuple[Path, bool, str]]:
+    """Atom-type verdicts in input order; unchanged files reuse the cached verdict."""
+    try: cache = json.loads(FILE_VALIDATION_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError): cache = {}
+    ligs = list(ligs)
+    verdicts: dict[str, tuple[bool, str]] = {}
+    todo, stamps = [], {}
+    for lig in ligs:
+        key = str(lig)
+        try: st = os.stat(key)
+        except OSError: todo.append(lig); continue
+        hit = cache.get(key)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            verdicts[key] = (hit[2], hit[3])
+        else:
+            todo.append(lig); stamps[key] = (st.st_size, st.st_mtime_ns)
+    if todo:
+        for lig, ok, why in _check_types(todo):
+            key = str(lig)
+            verdicts[key] = (ok, why)
+            if key in stamps: cache[key] = [*stamps[key], ok, why]
+        tmp = FILE_VALIDATION_CACHE.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(cache, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, FILE_VALIDATION_CACHE)
+    return [(lig, *verdicts[str(lig)]) for lig in ligs]
 
 def find_vinagpu_binary(vina_arg: str | None = None)->Path:
     provided = vina_arg or os.environ.get("MOLDOCK_VINA_GPU_PATH")
@@ -190,7 +348,7 @@ def load_runtime(vgpu: Path, args):
             + "\n",
             encoding="utf-8",
         )
-        chash = args.config_hash or hashlib.sha1(cfg_path.read_bytes()).hexdigest()[:10]
+        chash = args.config_hash or hashlib.new(DIGEST_ALGO, cfg_path.read_bytes()).hexdigest()[:10]
         print("Vina-GPU:", vgpu, "| Config:", cfg_path)
         print("Box:", box, "| GPU params:", gcfg)
         print("Ligand dir:", lig_dir, "| Output dir:", out_dir)
@@ -224,7 +382,7 @@ def load_runtime(vgpu: Path, args):
         lig_dir = Path(conf["ligand_directory"]).resolve() if "ligand_directory" in conf else DIR_PREP
         out_dir = Path(conf["output_directory"]).resolve() if "output_directory" in conf else DIR_RESULTS
 
-        chash = hashlib.sha1((cfg_path.read_text(encoding="utf-8")).encode("utf-8")).hexdigest()[:10]
+        chash = hashlib.new(DIGEST_ALGO, cfg_path.read_text(encoding="utf-8").encode("utf-8")).hexdigest()[:10]
         print("Vina-GPU:", vgpu, "| Config:", cfg_path)
         print("Box:", box, "| GPU params:", gcfg)
         print("Ligand dir:", lig_dir, "| Output dir:", out_dir)
@@ -235,51 +393,94 @@ def load_runtime(vgpu: Path, args):
     )
 
 # --- Pose parsing ---
-RES_RE = re.compile(r"REMARK VINA RESULT:\s+(-?\d+\.\d+)", re.I)
-def vina_pose_is_valid(p:Path)->Tuple[bool,Optional[float]]:
+# Unanchored on purpose: a literal-prefix search is a fast memchr-style scan,
+# while (?m)^ makes re try a match at every line start.
+RES_RE_BYTES = re.compile(rb"REMARK VINA RESULT:[ \t]+(-?\d+(?:\.\d*)?)")
+def vina_pose_is_valid(p:Path|str)->Tuple[bool,Optional[float]]:
     try:
-        if not p.exists() or p.stat().st_size<200: return (False,None)
-        txt=p.read_text(errors="ignore")
-        scores=[float(m.group(1)) for m in RES_RE.finditer(txt)]
-        return ((len(scores)>0), (min(scores) if scores else None))
-    except: return (False,None)
+        with open(p, "rb", buffering=0) as f:
+            if os.fstat(f.fileno()).st_size<200: return (False,None)
+            scores=RES_RE_BYTES.findall(f.read())
+    except OSError: return (False,None)
+    if not scores: return (False,None)
+    return (True, min(map(float, scores)))  # min, not first: don't rely on mode order
 
 # --- Helpers ---
 def chunked(it: Iterable[Path], n:int)->Iterable[list[Path]]:
-    buf=[]
-    for x in it:
-        buf.append(x)
-        if len(buf)==n:
-            yield buf; buf=[]
-    if buf: yield buf
-
-def build_and_write_summaries(manifest: dict[str,dict])->None:
-    summ_headers=["id","inchikey","vina_score","pose_path","created_at"]
-    rows=[]
-    for _,m in sorted(manifest.items()):
-        sc=m.get("vina_score","")
-        if sc:
-            rows.append({"id":m.get("id",""),
-                         "inchikey":m.get("inchikey",""),
-                         "vina_score":sc,
-                         "pose_path":m.get("vina_pose",""),
-                         "created_at":m.get("updated_at","")})
-    write_csv(FILE_SUMMARY, rows, summ_headers)
-    lead_headers=["rank","id","inchikey","vina_score","pose_path"]
-    ranked=sorted(rows, key=lambda r: float(r["vina_score"])) if rows else []
-    leaders=[{"rank":i,"id":r["id"],"inchikey":r["inchikey"],
-              "vina_score":r["vina_score"],"pose_path":r["pose_path"]}
-             for i,r in enumerate(ranked,1)]
-    write_csv(FILE_LEADER, leaders, lead_headers)
-
-def run_batch(vgpu:Path, cfg_file:Path, lig_dir:Path, out_dir:Path, gcfg:dict)->int:
+    if isinstance(it, list):  # slices are copied in C, no per-item append
+        for i in range(0, len(it), n): yield it[i:i+n]
+        return
+    it=iter(it)
+    while batch:=list(itertools.islice(it, n)): yield batch
+
+def rank_by_score(entries: list[tuple], top_k: Optional[int] = None)->list[tuple]:
+    if top_k is not None and top_k<len(entries):
+        return heapq.nsmallest(top_k, entries, key=lambda e: float(e[2]))  # O(N log K), same order as sorted()
+    if np is None or len(entries)<NUMPY_RANK_MIN:
+        return sorted(entries, key=lambda e: float(e[2]))
+    scores=np.fromiter((float(e[2]) for e in entries), dtype=np.float64, count=len(entries))
+    return [entries[i] for i in np.argsort(scores, kind="stable")]
+
+def build_and_write_summaries(manifest: dict[str,dict], top_k: Optional[int] = None)->None:
+    entries=[]  # (id, inchikey, vina_score, pose) of scored rows, kept only for ranking
+    def summary_rows():
+        for _,m in sorted(manifest.items()):
+            sc=m.get("vina_score","")
+            if sc:
+                e=(m.get("id",""), m.get("inchikey",""), sc, m.get("vina_pose",""))
+                entries.append(e)
+                yield (*e, m.get("updated_at",""))
+    write_rows(FILE_SUMMARY, ["id","inchikey","vina_score","pose_path","created_at"], summary_rows())
+    write_rows(FILE_LEADER, ["rank","id","inchikey","vina_score","pose_path"],
+               ((i,*e) for i,e in enumerate(rank_by_score(entries, top_k),1)))
+
+def stage_ligand(src: Path, dst: Path) -> None:
+    """Expose src in a batch dir; links fall back to a copy (cross-volume, no privilege)."""
+    try:
+        if STAGE_MODE == "hardlink":
+            os.link(src, dst); return
+        if STAGE_MODE == "symlink":
+            os.symlink(src, dst); return
+    except OSError:
+        pass
+    shutil.copy2(src, dst)
+
+def probe_free_vram_mb()->Optional[int]:
+    """Smallest free memory (MiB) across the GPUs nvidia-smi reports, or None."""
+    smi=shutil.which("nvidia-smi")
+    if not smi: return None
+    try:
+        out=subprocess.run([smi,"--query-gpu=memory.free","--format=csv,noheader,nounits"],
+                           capture_output=True, text=True, timeout=10, check=True).stdout
+        free=[int(x) for x in out.split()]
+    except (OSError, subprocess.SubprocessError, ValueError): return None
+    return min(free) if free else None
+
+def auto_batch_size()->int:
+    """MOLDOCK_GPU_BATCH_SIZE if set, else ~70% of free VRAM, clamped to [BATCH_SIZE, BATCH_SIZE_MAX]."""
+    forced=os.environ.get("MOLDOCK_GPU_BATCH_SIZE")
+    if forced: return max(1, int(forced))
+    free=probe_free_vram_mb()
+    if free is None: return BATCH_SIZE
+    return max(BATCH_SIZE, min(BATCH_SIZE_MAX, int(free*VRAM_TARGET_FRACTION/VRAM_PER_LIGAND_MB)))
+
+def gpu_env(slot:int)->Optional[dict]:
+    """Pin a batch to one device; slots index into an existing CUDA_VISIBLE_DEVICES list."""
+    if NUM_GPUS<=1: return None
+    visible=[d.strip() for d in os.environ.get("CUDA_VISIBLE_DEVICES","").split(",") if d.strip()]
+    return {**os.environ, "CUDA_VISIBLE_DEVICES": visible[slot % len(visible)] if visible else str(slot)}
+
+def start_batch(vgpu:Path, cfg_file:Path, lig_dir:Path, out_dir:Path, gcfg:dict, slot:int=0)->subprocess.Popen:
+    """Launch Vina-GPU on lig_dir without waiting, so the caller can harvest meanwhile."""
     cmd=[str(vgpu),"--config",str(cfg_file),
          "--ligand_directory",str(lig_dir),
          "--output_directory",str(out_dir),
          "--thread",str(gcfg["thread"]),
          "--search_depth",str(gcfg["search_depth"])]
     print("Batch CMD:", " ".join(shlex.quote(c) for c in cmd))
-    return subprocess.call(cmd)
+    proc=subprocess.Popen(cmd, env=gpu_env(slot), start_new_session=True)
+    _CHILDREN.add(proc)
+    return proc
 
 # --- Main ---
 def main() -> int:
@@ -298,98 +499,163 @@ def main() -> int:
     parser.add_argument("--config-hash", default=None)
     args = parser.parse_args()
 
+    global NUM_GPUS
+    NUM_GPUS = num_gpus_from_env()
     vgpu = find_vinagpu_binary(args.vina)
     box,gcfg,receptor,chash,lig_dir,out_dir,cfg_file = load_runtime(vgpu, args)
+    # Resolved once; per-ligand paths below are plain joins (no realpath per ligand)
+    lig_dir, out_dir = lig_dir.resolve(), out_dir.resolve()
+    out_prefix = f"{out_dir}{os.sep}"
 
-    all_ligs = sorted(lig_dir.glob("*.pdbqt"))
+    # Stream ligands lazily; only peek once to fail fast on an empty dir.
     only_ids = only_ids_from_env()
-    if only_ids is not None:
-        all_ligs = [lig for lig in all_ligs if lig.stem in only_ids]
-    if not all_ligs: raise SystemExit("❌ No ligand PDBQTs found.")
+    all_ligs = (lig for lig in iter_ligands(lig_dir) if only_ids is None or lig.stem in only_ids)
+    first = next(all_ligs, None)
+    if first is None: raise SystemExit("❌ No ligand PDBQTs found.")
+    all_ligs = itertools.chain((first,), all_ligs)
     out_dir.mkdir(parents=True, exist_ok=True)
 
     if SAFE_RESUME:
-        pending=[p for p in all_ligs if not (out_dir / f"{p.stem}_out.pdbqt").exists()]
+        done=docked_stems(out_dir)
+        pending=(p for p in all_ligs if p.stem not in done)
     else:
-        pending=list(all_ligs)
+        pending=all_ligs
 
     manifest = load_manifest()
     created_ts = now_iso()
-    receptor_sha = sha1_of_file(receptor)
+    receptor_digest = cached_digest(receptor)
 
     # Filter out ligands with invalid atom types
     valid_pending=[]
-    for lig in pending:
-        ok, why = pdbqt_has_only_allowed_types(lig)
+    dirty=[]
+    for lig, ok, why in validate_ligands(pending):
         if not ok:
             lig_id = lig.stem
-            m = manifest.get(lig_id, {k:"" for k in MANIFEST_FIELDS})
+            m = manifest.get(lig_id) or _EMPTY.copy()
             m["id"]=lig_id
-            m["pdbqt_path"]=str(lig.resolve())
+            m["pdbqt_path"]=str(lig)
             m["vina_status"]="FAILED"
             m["vina_reason"]=why
             m.setdefault("created_at", created_ts)
             m["updated_at"]=now_iso()
             manifest[lig_id]=m
+            dirty.append(lig_id)
             print(f"⚠️ Skipping {lig.name} — {why}")
         else:
             valid_pending.append(lig)
-    save_manifest(manifest)
 
     if not valid_pending:
+        compact_manifest(manifest)
         print("✅ No valid ligands left to process. Summaries updated.")
         build_and_write_summaries(manifest)
         return
+    append_manifest_deltas(manifest, dirty)
 
     # Mini-batch loop
     tmp_root = out_dir / "_batch_tmp"
     tmp_root.mkdir(parents=True, exist_ok=True)
 
+    def harvest(bi:int, batch:list[Path], tmp_dir:Path, rc:int)->None:
+        """Record a finished batch; a failed batch either requeues its missing ligands or stops launching."""
+        nonlocal launching, batch_size
+        poses=[out_prefix + lig.stem + POSE_SUFFIX for lig in batch]  # plain strings, no Path per pose
+        missing=[]
+        for lig, pose, (ok,best) in zip(batch, poses, harvest_pool.map(vina_pose_is_valid, poses)):
+            if not ok: missing.append(lig)
+            lig_id = lig.stem
+            m = manifest.get(lig_id) or _EMPTY.copy()
+            m["id"]=lig_id
+            m["pdbqt_path"]=str(lig)
+            m["vina_status"]="DONE" if ok else "FAILED"
+            m["vina_pose"]=pose
+            m["vina_reason"]="OK" if ok else "No VINA RESULT found"
+            m["vina_score"]=f"{best:.2f}" if ok and best is not None else ""
+            m["config_hash"]=chash
+            m["receptor_digest"]=receptor_digest
+            m["tools_vina"]=str(vgpu)
+            m.setdefault("created_at", created_ts)
+            m["updated_at"]=now_iso()
+            manifest[lig_id]=m
+        append_manifest_deltas(manifest, (lig.stem for lig in batch))
+        if bi % SUMMARY_EVERY == 0:
+            build_and_write_summaries(manifest, top_k=CHECKPOINT_TOP_K)
+        if not KEEP_TMP:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        if rc == 0 or not launching:
+            return
+        if len(batch) > 1 and len(missing) < len(batch) and not (STOP_REQUESTED or HARD_STOP):
+            # Partial output is the GPU OOM signature: halve the batch size and retry what is missing.
+            # A batch that produced nothing (no OpenCL, bad receptor/config) will not succeed smaller.
+            batch_size = max(1, min(batch_size, len(batch)) // 2)
+            print(f"⚠️ Batch {bi} rc={rc}. Retrying its missing ligands with batch size {batch_size}.")
+            retry.extend(chunked(missing, batch_size))
+        else:
+            print(f"⚠️ Batch {bi} rc={rc}. Harvesting outputs then stopping.")
+            launching = False
+
+    # Every GPU slot runs its own batch; finished batches are harvested while the
+    # next ones run. Manifest updates all happen on this thread.
+    harvest_pool = ThreadPoolExecutor(max_workers=HARVEST_THREADS)
+    batch_size = auto_batch_size()
+    print(f"Batch size: {batch_size}")
+    pos, bi = 0, 0  # next index into valid_pending, batches launched so far
+    retry: collections.deque[list[Path]] = collections.deque()  # halved re-runs of failed batches
+    running: dict[int, tuple] = {}  # slot -> (proc, bi, batch, tmp_dir)
+    finished: list[tuple] = []  # (bi, batch, tmp_dir, rc) awaiting harvest
+    launching = True
     try:
-        for bi, batch in enumerate(chunked(valid_pending, BATCH_SIZE), 1):
-            if STOP_REQUESTED or HARD_STOP:
+        while True:
+            if launching and (STOP_REQUESTED or HARD_STOP):
                 print("🧾 Stop requested — exiting before next batch.")
+                launching = False
+            # Failed batches are harvested before launching: they requeue ligands or stop the run.
+            failed=[f for f in finished if f[3]!=0]
+            if failed:
+                finished=[f for f in finished if f[3]==0]
+                for item in failed: harvest(*item)
+            for slot in range(NUM_GPUS):
+                if not launching: break
+                if slot in running: continue
+                if retry:
+                    batch = retry.popleft()
+                elif pos < len(valid_pending):
+                    batch = valid_pending[pos:pos+batch_size]; pos += len(batch)
+                elif running:
+                    break  # a failing batch may still requeue ligands
+                else:
+                    launching = False; break
+                bi += 1
+                tmp_dir = tmp_root / f"b{bi:04d}"
+                if tmp_dir.exists(): shutil.rmtree(tmp_dir, ignore_errors=True)
+                tmp_dir.mkdir(parents=True, exist_ok=True)
+                for lig in batch: stage_ligand(lig, tmp_dir / lig.name)
+                running[slot] = (start_batch(vgpu, cfg_file, tmp_dir, out_dir, gcfg, slot), bi, batch, tmp_dir)
+
+            if not running and not (launching and (retry or pos < len(valid_pending))):
                 break
-
-            tmp_dir = tmp_root / f"b{bi:04d}"
-            if tmp_dir.exists(): shutil.rmtree(tmp_dir, ignore_errors=True)
-            tmp_dir.mkdir(parents=True, exist_ok=True)
-            for lig in batch: shutil.copy2(lig, tmp_dir / lig.name)
-
-            rc = run_batch(vgpu, cfg_file, tmp_dir, out_dir, gcfg)
-            if rc != 0:
-                print(f"⚠️ Batch {bi} rc={rc}. Harvesting outputs then stopping.")
-
-            # Harvest
-            for lig in batch:
-                lig_id = lig.stem
-                pose = out_dir / f"{lig_id}_out.pdbqt"
-                ok,best = vina_pose_is_valid(pose)
-                m = manifest.get(lig_id, {k:"" for k in MANIFEST_FIELDS})
-                m["id"]=lig_id
-                m["pdbqt_path"]=str(lig.resolve())
-                m["vina_status"]="DONE" if ok else "FAILED"
-                m["vina_pose"]=str(pose.resolve())
-                m["vina_reason"]="OK" if ok else "No VINA RESULT found"
-                m["vina_score"]=f"{best:.2f}" if ok and best is not None else ""
-                m["config_hash"]=chash
-                m["receptor_sha1"]=receptor_sha
-                m["tools_vina"]=str(vgpu)
-                m.setdefault("created_at", created_ts)
-                m["updated_at"]=now_iso()
-                manifest[lig_id]=m
-
-            save_manifest(manifest)
-            build_and_write_summaries(manifest)
-            if not KEEP_TMP:
-                shutil.rmtree(tmp_dir, ignore_errors=True)
-            if rc != 0:
-                break
+            while finished:
+                harvest(*finished.pop(0))
+            time.sleep(0.2)
+            for slot, (proc, done_bi, done_batch, done_dir) in list(running.items()):
+                rc = proc.poll()
+                if rc is None: continue
+                _CHILDREN.discard(proc)
+                del running[slot]
+                finished.append((done_bi, done_batch, done_dir, rc))
 
     finally:
+        if running:  # only on an exception: don't leave Vina-GPU behind
+            _kill_children()
+            launching = False
+            for proc, done_bi, done_batch, done_dir in running.values():
+                proc.wait(); _CHILDREN.discard(proc)
+                finished.append((done_bi, done_batch, done_dir, 0))
+        for item in finished:
+            harvest(*item)
+        harvest_pool.shutdown()
         if not KEEP_TMP:
             shutil.rmtree(tmp_root, ignore_errors=True)
-        save_manifest(manifest)
+        compact_manifest(manifest)
         build_and_write_summaries(manifest)
         print("✅ Mini-batch GPU docking done (or safely stopped).")
         print(f"Manifest: {FILE_MANIFEST}")
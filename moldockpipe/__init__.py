@@ -1,5 +1,12 @@
 """MolDockPipe engine package."""
 
-from .engine import resume, run, status, validate
-
 __all__ = ["run", "resume", "status", "validate"]
+
+
+def __getattr__(name: str):
+    # Defer the engine import so CLI commands that never touch it start faster.
+    if name in __all__:
+        from . import engine
+
+        return getattr(engine, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,3 +1,10 @@
-from . import admet, build3d, docking_cpu, docking_gpu, meeko
+import importlib
 
 __all__ = ["admet", "build3d", "meeko", "docking_cpu", "docking_gpu"]
+
+
+def __getattr__(name: str):
+    # Submodules load on first use so `import moldockpipe.adapters.common` stays cheap.
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -48,22 +48,15 @@ def run_script(
         env.update({k: str(v) for k, v in extra_env.items()})
 
     cmd = [sys.executable, str(script_path), *(args or [])]
-    proc = subprocess.run(
-        cmd,
-        cwd=project_dir,
-        env=env,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-        capture_output=True,
-        check=False,
-    )
-    stdout_log.write_text(proc.stdout or "", encoding="utf-8", errors="replace")
-    stderr_log.write_text(proc.stderr or "", encoding="utf-8", errors="replace")
+    # Child output goes straight to the log files (no in-memory capture, and the
+    # logs fill up while the module runs).
+    with open(stdout_log, "wb") as so, open(stderr_log, "wb") as se:
+        proc = subprocess.Popen(cmd, cwd=project_dir, env=env, stdout=so, stderr=se)
+        returncode = proc.wait()
 
     return AdapterResult(
         module=module,
-        returncode=proc.returncode,
+        returncode=returncode,
         command=cmd,
         stdout_log=str(stdout_log),
         stderr_log=str(stderr_log),
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import json
 import os
-import subprocess
 import sys
+import threading
+import traceback
 from pathlib import Path
 
 import click
 
-from moldockpipe import engine
+from moldockpipe import jsonio
 from moldockpipe.purge import purge_project
 from moldockpipe.run_ui import render_final_summary, watch_run_status
 
@@ -18,8 +18,12 @@ def app():
     pass
 
 
-def _emit_and_exit(result: dict) -> None:
-    click.echo(json.dumps(result, indent=2))
+def _finalize(result: dict, *, emit_json: bool = True) -> None:
+    # The live UI renders the result dict directly; only machine output goes through JSON.
+    if emit_json:
+        click.echo(jsonio.dumps(result, pretty=True))
+    else:
+        render_final_summary(result)
     raise click.exceptions.Exit(code=int(result.get("exit_code", 0)))
 
 
@@ -37,50 +41,45 @@ def _ui_enabled(no_ui: bool) -> bool:
 @click.option("--rerun-failed-only", is_flag=True, default=False, help="Rerun only rows marked FAILED for each stage.")
 @click.option("--from-module", type=click.IntRange(1,4), default=1, show_default=True, help="Start planning from module N.")
 def run(project_dir: Path, docking_mode: str, no_ui: bool, force: bool, rerun_failed_only: bool, from_module: int):
+    from moldockpipe import engine
+
     if not _ui_enabled(no_ui):
-        _emit_and_exit(engine.run(project_dir, {"docking_mode": docking_mode}, force=force, rerun_failed_only=rerun_failed_only, from_module=from_module))
-
-    cmd = [
-        sys.executable,
-        "-m",
-        "moldockpipe.cli",
-        "_run-engine",
-        str(project_dir),
-        "--docking-mode",
-        docking_mode,
-        "--from-module",
-        str(from_module),
-    ]
-    if force:
-        cmd.append("--force")
-    if rerun_failed_only:
-        cmd.append("--rerun-failed-only")
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    status_path = project_dir.resolve() / "state" / "run_status.json"
+        _finalize(engine.run(project_dir, {"docking_mode": docking_mode}, force=force, rerun_failed_only=rerun_failed_only, from_module=from_module))
 
-    # Read-only watcher: engine child remains single source of state updates.
-    watch_run_status(status_path, poll_interval_s=1.0)
+    # Run the engine on a worker thread so the UI needs no second interpreter; the
+    # engine mostly waits on module subprocesses, so the GIL is not contended.
+    outcome: dict = {}
 
-    stdout, stderr = proc.communicate()
-    result = None
-    if stdout:
+    def _engine_worker() -> None:
         try:
-            result = json.loads(stdout)
-        except json.JSONDecodeError:
-            result = None
+            outcome["result"] = engine.run(project_dir, {"docking_mode": docking_mode}, force=force, rerun_failed_only=rerun_failed_only, from_module=from_module)
+        except BaseException as exc:
+            outcome["result"] = {"ok": False, "exit_code": 1, "error": f"{type(exc).__name__}: {exc}"}
+            outcome["traceback"] = traceback.format_exc()
+
+    worker = threading.Thread(target=_engine_worker, name="moldock-engine", daemon=True)
+    worker.start()
+    status_path = project_dir.resolve() / "state" / "run_status.json"
 
-    if result is None:
-        result = {
-            "exit_code": int(proc.returncode or 1),
-            "error": "Engine subprocess did not return JSON output.",
-            "stderr": (stderr or "").strip(),
-        }
+    # Read-only watcher: the engine thread remains single source of state updates.
+    # Ctrl+C also reaches the module subprocesses, which stop on their own; keep
+    # watching until the engine returns unless the user presses it again.
+    interrupted = False
+    while True:
+        try:
+            watch_run_status(status_path, poll_interval_s=1.0, stop_when=lambda: not worker.is_alive())
+            worker.join()
+            break
+        except KeyboardInterrupt:
+            if interrupted:
+                raise
+            interrupted = True
+            click.echo("\nCtrl+C: waiting for the engine to stop (press again to abort)...", err=True)
 
-    render_final_summary(result)
-    if stderr and stderr.strip():
-        click.echo("\n[engine stderr]", err=True)
-        click.echo(stderr.strip(), err=True)
-    raise click.exceptions.Exit(code=int(proc.returncode if proc.returncode is not None else result.get("exit_code", 1)))
+    if outcome.get("traceback"):
+        click.echo("\n[engine error]", err=True)
+        click.echo(outcome["traceback"].strip(), err=True)
+    _finalize(outcome["result"], emit_json=False)
 
 
 @app.command(name="_run-engine", hidden=True)
@@ -90,8 +89,10 @@ def run(project_dir: Path, docking_mode: str, no_ui: bool, force: bool, rerun_fa
 @click.option("--rerun-failed-only", is_flag=True, default=False)
 @click.option("--from-module", type=click.IntRange(1,4), default=1)
 def run_engine(project_dir: Path, docking_mode: str, force: bool, rerun_failed_only: bool, from_module: int):
-    # Internal entrypoint used by the live UI parent process.
-    _emit_and_exit(engine.run(project_dir, {"docking_mode": docking_mode}, force=force, rerun_failed_only=rerun_failed_only, from_module=from_module))
+    from moldockpipe import engine
+
+    # Internal entrypoint: runs the engine without the live UI and prints the result JSON.
+    _finalize(engine.run(project_dir, {"docking_mode": docking_mode}, force=force, rerun_failed_only=rerun_failed_only, from_module=from_module))
 
 
 @app.command()
@@ -99,24 +100,30 @@ def run_engine(project_dir: Path, docking_mode: str, force: bool, rerun_failed_o
 @click.option("--docking-mode", default="cpu", type=click.Choice(["cpu", "gpu"], case_sensitive=False))
 @click.option("--json", "as_json", is_flag=True, default=False, help="Emit machine-readable JSON.")
 def validate(project_dir: Path, docking_mode: str, as_json: bool):
+    from moldockpipe import engine
+
     result = engine.validate_project(project_dir, {"docking_mode": docking_mode})
-    _emit_and_exit(result if as_json else result)
+    _finalize(result if as_json else result)
 
 
 @app.command()
 @click.argument("project_dir", type=click.Path(path_type=Path))
 def resume(project_dir: Path):
-    _emit_and_exit(engine.resume(project_dir))
+    from moldockpipe import engine
+
+    _finalize(engine.resume(project_dir))
 
 
 @app.command()
 @click.argument("project_dir", type=click.Path(path_type=Path))
 @click.option("--json", "as_json", is_flag=True, default=False, help="Emit machine-readable JSON.")
 def status(project_dir: Path, as_json: bool):
+    from moldockpipe import engine
+
     result = engine.status(project_dir)
     if as_json:
-        _emit_and_exit(result)
-    click.echo(json.dumps(result, indent=2))
+        _finalize(result)
+    click.echo(jsonio.dumps(result, pretty=True))
 
 
 
@@ -126,15 +133,19 @@ def status(project_dir: Path, as_json: bool):
 @click.option("--docking-mode", default="cpu", type=click.Choice(["cpu", "gpu"], case_sensitive=False))
 @click.option("--json", "as_json", is_flag=True, default=False, help="Emit machine-readable JSON.")
 def plan(project_dir: Path, docking_mode: str, as_json: bool):
+    from moldockpipe import engine
+
     result = engine.plan(project_dir, {"docking_mode": docking_mode})
     if as_json:
-        _emit_and_exit(result)
-    click.echo(json.dumps(result, indent=2))
+        _finalize(result)
+    click.echo(jsonio.dumps(result, pretty=True))
 
 @app.command("export-report")
 @click.argument("project_dir", type=click.Path(path_type=Path))
 def export_report(project_dir: Path):
-    click.echo(json.dumps(engine.export_report(project_dir), indent=2))
+    from moldockpipe import engine
+
+    click.echo(jsonio.dumps(engine.export_report(project_dir), pretty=True))
 
 
 @app.command()
@@ -144,7 +155,7 @@ def export_report(project_dir: Path):
 def purge(project_dir: Path | None, confirm1: str | None, confirm2: str | None):
     """Purge a project folder for a fresh run (destructive)."""
     base = project_dir or Path(".")
-    _emit_and_exit(purge_project(base, confirm1=confirm1, confirm2=confirm2))
+    _finalize(purge_project(base, confirm1=confirm1, confirm2=confirm2))
 
 
 def main() -> None:
@@ -1,29 +1,39 @@
 from __future__ import annotations
 
 import csv
+import functools
 import hashlib
 import importlib
-import importlib.metadata
 import importlib.util
 import json
+import os
 import platform
 import shutil
 import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
+from types import MappingProxyType
 
-from moldockpipe.adapters import admet, build3d, docking_cpu, docking_gpu, meeko
 from moldockpipe.adapters.common import REPO_ROOT
+from moldockpipe import jsonio
 from moldockpipe.artifacts import pdbqt_path, sdf_path, vina_out_path
 from moldockpipe.fingerprints import pdbqt_fp as make_pdbqt_fp, sdf_fp as make_sdf_fp, sha1_file, vina_fp as make_vina_fp
-from moldockpipe.state import read_manifest, read_run_status, update_run_status, write_json_atomic, write_manifest
+from moldockpipe.state import copy_manifest, read_manifest, read_run_status, update_run_status, write_json_atomic, write_manifest, write_run_status
 from moldockpipe.planner import compute_work_plan
 
-try:
-    import yaml
-except Exception:  # pragma: no cover
-    yaml = None
 
+@functools.lru_cache(maxsize=1)
+def _yaml_loader():
+    """Return (yaml, Loader), or None without PyYAML; imported on first use (~18 ms)."""
+    try:
+        import yaml
+    except Exception:  # pragma: no cover
+        return None
+    # libyaml's C loader when PyYAML was built with it; same safe semantics, much faster.
+    return yaml, getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_ADAPTER_NAMES = frozenset({"admet", "build3d", "meeko", "docking_cpu", "docking_gpu"})
 MODULES: list[str] = ["module1_admet", "module2_build3d", "module3_meeko", "module4_docking"]
 MODULE_LABELS = {
     "module1_admet": "Running Module 1/4: ADMET screening",
@@ -31,22 +41,30 @@ MODULE_LABELS = {
     "module3_meeko": "Running Module 3/4: Meeko ligand prep",
     "module4_docking": "Running Module 4/4: Vina docking",
 }
-
-DEFAULT_CONFIG = {
+# (index, module, label, percent at start, percent when finished) for the _execute loop.
+_MODULE_META: tuple[tuple[int, str, str, int, int], ...] = tuple(
+    (idx, name, MODULE_LABELS[name], int(((idx - 1) / len(MODULES)) * 100), int((idx / len(MODULES)) * 100))
+    for idx, name in enumerate(MODULES, start=1)
+)
+
+# Read-only template; _load_project_config builds each config from a _fast_copy of it.
+DEFAULT_CONFIG = MappingProxyType({
     "docking_mode": "cpu",
     "strict_versions": False,
     "receptor_path": "receptors/target_prepared.pdbqt",
-    "tools": {"vina_cpu_path": "tools/vina_1.2.7_win.exe", "vina_gpu_path": "tools/vina-gpu.exe"},
-    "docking": {
-        "box": {"center": [0.0, 0.0, 0.0], "size": [20.0, 20.0, 20.0]},
+    "tools": MappingProxyType({"vina_cpu_path": "tools/vina_1.2.7_win.exe", "vina_gpu_path": "tools/vina-gpu.exe"}),
+    "docking": MappingProxyType({
+        "box": MappingProxyType({"center": (0.0, 0.0, 0.0), "size": (20.0, 20.0, 20.0)}),
         "exhaustiveness": 8,
         "num_modes": 9,
         "energy_range": 3,
-    },
-}
+    }),
+})
 CPU_VINA_CANDIDATES = ["vina", "vina.exe", "vina_1.2.7_win.exe", "vina_1.2.5_win.exe"]
 GPU_VINA_CANDIDATES = ["Vina-GPU+.exe", "Vina-GPU+_K.exe", "Vina-GPU.exe", "vina-gpu.exe", "vina-gpu"]
 RECOMMENDED = {"python": "3.11", "rdkit": "2025.03.", "meeko": "0.6.1"}
+# Minimum spacing between non-essential run_status.json rewrites (skips, post-module progress).
+STATUS_FLUSH_MIN_S = 0.2
 
 
 class PreflightError(RuntimeError):
@@ -63,7 +81,7 @@ def _ensure_run_requirements(paths: dict[str, Path], versions: dict) -> None:
             + ", ".join(missing)
             + ". Select a Python environment with MolDock dependencies installed."
         )
-    if paths["run_yml"].exists() and yaml is None:
+    if paths["run_yml"].exists() and _yaml_loader() is None:
         raise PreflightError(
             "config/run.yml exists but PyYAML is unavailable in the selected Python. "
             "Install PyYAML or choose the MolDock environment."
@@ -75,7 +93,7 @@ def _compact_now() -> str:
 
 
 def _iso_now() -> str:
-    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 def _deep_update(dst: dict, src: dict) -> dict:
@@ -87,6 +105,15 @@ def _deep_update(dst: dict, src: dict) -> dict:
     return dst
 
 
+def _fast_copy(value):
+    """Copy a JSON-shaped structure: new dicts/lists, scalar leaves shared (they are immutable)."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: _fast_copy(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_fast_copy(v) for v in value]
+    return value
+
+
 def _canonical_json(data: dict) -> str:
     return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
 
@@ -111,6 +138,7 @@ def _project_paths(project_dir: Path) -> dict[str, Path]:
         "logs_dir": project_dir / "logs",
         "engine_logs_dir": project_dir / "logs" / "engine",
         "preflight_log": project_dir / "logs" / "preflight.log",
+        "preflight_cache": project_dir / "state" / "preflight_cache.json",
         "results_dir": project_dir / "results",
         "structures_dir": project_dir / "3D_Structures",
         "prepared_dir": project_dir / "prepared_ligands",
@@ -127,6 +155,27 @@ def _runtime_info() -> dict:
     }
 
 
+# Tool path probes repeat on every entry point; existence results are reused briefly.
+PATH_PROBE_TTL_S = 1.0
+_PATH_PROBE_CACHE: dict[str, tuple[float, bool]] = {}
+
+
+def _cached_exists(path: Path) -> bool:
+    key = str(path)
+    now = time.monotonic()
+    hit = _PATH_PROBE_CACHE.get(key)
+    if hit is not None and now - hit[0] < PATH_PROBE_TTL_S:
+        return hit[1]
+    exists = path.exists()
+    _PATH_PROBE_CACHE[key] = (now, exists)
+    return exists
+
+
+@functools.lru_cache(maxsize=64)
+def _which(candidate: str, search_path: str | None) -> str | None:
+    return shutil.which(candidate, path=search_path)
+
+
 def normalize_path(project_dir_abs: Path, platform_root_abs: Path, user_path: str | None, mode: str) -> Path | None:
     if not user_path:
         return None
@@ -134,43 +183,114 @@ def normalize_path(project_dir_abs: Path, platform_root_abs: Path, user_path: st
     if p.is_absolute():
         return p.resolve()
     project_candidate = (project_dir_abs / p).resolve()
-    if project_candidate.exists() or mode == "receptor":
+    if mode == "receptor" or _cached_exists(project_candidate):
         return project_candidate
     if mode == "tool":
         platform_candidate = (platform_root_abs / p).resolve()
-        if platform_candidate.exists():
+        if _cached_exists(platform_candidate):
             return platform_candidate
     return project_candidate
 
 
+def _dir_names(folder: Path) -> frozenset[str]:
+    # normcase keeps lookups case-insensitive on Windows, like the exists() probes they replace.
+    try:
+        with os.scandir(folder) as it:
+            return frozenset(os.path.normcase(entry.name) for entry in it)
+    except OSError:
+        return frozenset()
+
+
 def _resolve_tool_path(configured: str | None, project_dir: Path, candidates: list[str]) -> tuple[str | None, str | None]:
+    # REPO_ROOT is already resolved; project_dir is resolved once rather than per probe.
+    project_abs = project_dir.resolve()
     if configured:
-        resolved = normalize_path(project_dir.resolve(), REPO_ROOT.resolve(), configured, mode="tool")
-        if resolved and resolved.exists():
+        resolved = normalize_path(project_abs, REPO_ROOT, configured, mode="tool")
+        if resolved and _cached_exists(resolved):
             return str(resolved), None
         return None, f"Configured tool path not found: {configured}"
+    # One directory listing per base replaces a stat per (candidate, base); only listed names are stat'ed.
+    listings = [(base, _dir_names(base)) for base in (project_abs, REPO_ROOT)]
+    search_path = os.environ.get("PATH")
     for candidate in candidates:
-        for base in (project_dir.resolve(), REPO_ROOT.resolve()):
+        key = os.path.normcase(candidate)
+        for base, names in listings:
+            if key not in names:
+                continue
             p = (base / candidate).resolve()
-            if p.exists():
+            if _cached_exists(p):
                 return str(p), f"Configured path missing; used fallback candidate '{candidate}'."
-        found = shutil.which(candidate)
+        found = _which(candidate, search_path)
         if found:
             return found, f"Configured path missing; used PATH fallback '{candidate}'."
     return None, None
 
 
+# Parsed run.yml keyed by path; reused while (size, mtime_ns) is unchanged.
+_RUN_YML_CACHE: dict[str, tuple[tuple[int, int], dict]] = {}
+
+
+def _run_yml_sidecar(run_yml: Path) -> Path:
+    # JSON copy of the last parsed config/run.yml, so a fresh process can skip the YAML parser.
+    return run_yml.parent.parent / "state" / "run_yml_cache.json"
+
+
+def _load_run_yml_sidecar(run_yml: Path, sig: tuple[int, int]) -> dict | None:
+    try:
+        cached = jsonio.loads(_run_yml_sidecar(run_yml).read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or [cached.get("size"), cached.get("mtime_ns")] != list(sig):
+        return None
+    data = cached.get("config")
+    return data if isinstance(data, dict) else None
+
+
+def _write_run_yml_sidecar(run_yml: Path, sig: tuple[int, int], data: dict) -> None:
+    try:
+        payload = jsonio.dumpb({"size": sig[0], "mtime_ns": sig[1], "config": data})
+        # Only cache configs that survive JSON unchanged (no dates, sets, non-str keys, NaN).
+        if jsonio.loads(payload)["config"] != data:
+            return
+        sidecar = _run_yml_sidecar(run_yml)
+        tmp = sidecar.with_name(sidecar.name + ".tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, sidecar)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def _read_run_yml(run_yml: Path) -> dict | None:
+    """Parsed run.yml, or None when it has to be parsed and PyYAML is unavailable."""
+    st = run_yml.stat()
+    sig = (st.st_size, st.st_mtime_ns)
+    hit = _RUN_YML_CACHE.get(str(run_yml))
+    if hit is None or hit[0] != sig:
+        data = _load_run_yml_sidecar(run_yml, sig)
+        if data is None:
+            loader = _yaml_loader()
+            if loader is None:
+                return None
+            yaml, yaml_loader = loader
+            data = yaml.load(run_yml.read_text(encoding="utf-8"), Loader=yaml_loader) or {}
+            data = data if isinstance(data, dict) else {}
+            _write_run_yml_sidecar(run_yml, sig, data)
+        hit = (sig, data)
+        _RUN_YML_CACHE[str(run_yml)] = hit
+    # _deep_update stores nested values by reference; never hand out the cached objects.
+    return _fast_copy(hit[1])
+
+
 def _load_project_config(project_dir: Path, cli_config: dict | None) -> tuple[dict, list[str]]:
-    cfg = json.loads(json.dumps(DEFAULT_CONFIG))
+    cfg = _fast_copy(DEFAULT_CONFIG)
     warnings: list[str] = []
     run_yml = project_dir / "config" / "run.yml"
     if run_yml.exists():
-        if yaml is None:
+        data = _read_run_yml(run_yml)
+        if data is None:
             warnings.append("run.yml exists but PyYAML is unavailable; using defaults + CLI overrides.")
         else:
-            data = yaml.safe_load(run_yml.read_text(encoding="utf-8")) or {}
-            if isinstance(data, dict):
-                _deep_update(cfg, data)
+            _deep_update(cfg, data)
     else:
         warnings.append("config/run.yml not found; using defaults + CLI overrides.")
     if cli_config:
@@ -180,6 +300,13 @@ def _load_project_config(project_dir: Path, cli_config: dict | None) -> tuple[di
 
 
 def _collect_versions() -> dict:
+    return dict(_collect_versions_once())
+
+
+@functools.lru_cache(maxsize=1)
+def _collect_versions_once() -> dict:
+    # Constant for the life of the process; importing rdkit/pandas to read
+    # __version__ is the expensive part, so it happens at most once.
     def modv(name: str):
         try:
             return getattr(importlib.import_module(name), "__version__", None)
@@ -188,6 +315,8 @@ def _collect_versions() -> dict:
 
     def pkgv(name: str):
         try:
+            import importlib.metadata  # ~25 ms to import; only preflight needs it
+
             return importlib.metadata.version(name)
         except Exception:
             return None
@@ -243,9 +372,18 @@ def _legacy_vina_config_exists(mode: str, vina_path: str | None) -> bool:
     return (vp.parent / "VinaConfig.txt").exists() or (mode == "gpu" and (vp.parent / "VinaGPUConfig.txt").exists())
 
 
+# Project directories already ensured by this process; the engine never removes them.
+_DIRS_CREATED: set[Path] = set()
+
+
 def _ensure_dirs(paths: dict[str, Path]) -> None:
-    for key in ("state_dir", "runs_dir", "logs_dir", "engine_logs_dir", "results_dir", "structures_dir", "prepared_dir"):
-        paths[key].mkdir(parents=True, exist_ok=True)
+    # Leaf directories only: runs_dir creates state_dir, engine_logs_dir creates logs_dir.
+    for key in ("runs_dir", "engine_logs_dir", "results_dir", "structures_dir", "prepared_dir"):
+        path = paths[key]
+        if path in _DIRS_CREATED:
+            continue
+        path.mkdir(parents=True, exist_ok=True)
+        _DIRS_CREATED.add(path)
 
 
 def _validate_contract(paths: dict[str, Path], raw_config: dict, warnings: list[str]) -> tuple[dict, dict]:
@@ -254,7 +392,15 @@ def _validate_contract(paths: dict[str, Path], raw_config: dict, warnings: list[
     if not paths["input_csv"].exists():
         raise PreflightError(f"Missing required input file: {paths['input_csv']}")
 
-    receptor = normalize_path(paths["project"], REPO_ROOT.resolve(), raw_config.get("receptor_path"), mode="receptor")
+    # Collecting versions imports rdkit/meeko/pandas; overlap it with the filesystem probes below.
+    # shutdown(wait=False) lets a failing preflight return without waiting for the imports.
+    from concurrent.futures import ThreadPoolExecutor  # ~7 ms to import; only preflight needs it
+
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preflight-versions")
+    versions_future = pool.submit(_collect_versions)
+    pool.shutdown(wait=False)
+
+    receptor = normalize_path(paths["project"], REPO_ROOT, raw_config.get("receptor_path"), mode="receptor")
     if receptor is None or not receptor.exists():
         raise PreflightError(f"Missing receptor file: {receptor}")
 
@@ -287,14 +433,14 @@ def _validate_contract(paths: dict[str, Path], raw_config: dict, warnings: list[
             raise
 
     resolved = {
-        "receptor_path": str(receptor.resolve()),
+        "receptor_path": str(receptor),
         "vina_cpu_path": str(Path(resolved_cpu).resolve()) if resolved_cpu else None,
         "vina_gpu_path": str(Path(resolved_gpu).resolve()) if resolved_gpu else None,
         "box": (resolved_docking or {}).get("box"),
         "docking_params": (resolved_docking or {}).get("docking_params"),
     }
 
-    versions = _collect_versions()
+    versions = versions_future.result()
     vw = _version_warnings(versions)
     warnings.extend(vw)
     if raw_config.get("strict_versions") and vw:
@@ -302,6 +448,54 @@ def _validate_contract(paths: dict[str, Path], raw_config: dict, warnings: list[
     return resolved, versions
 
 
+def _stat_stamp(path: str | None) -> list[int] | None:
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _preflight_stamps(resolved: dict) -> dict:
+    # Everything a preflight result depends on besides the config: the interpreter, the
+    # receptor and Vina binaries, and the installed toolchain packages (found without importing).
+    stamps: dict = {"python_executable": sys.executable}
+    for key in ("receptor_path", "vina_cpu_path", "vina_gpu_path"):
+        stamps[key] = _stat_stamp(resolved.get(key))
+    for name in ("rdkit", "meeko", "pandas"):
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            spec = None
+        stamps[name] = _stat_stamp(spec.origin if spec else None)
+    return stamps
+
+
+def _save_preflight_cache(paths: dict[str, Path], config_hash: str, resolved: dict, versions: dict, warnings: list[str]) -> None:
+    write_json_atomic(
+        paths["preflight_cache"],
+        {"config_hash": config_hash, "stamps": _preflight_stamps(resolved), "resolved": resolved, "versions": versions, "warnings": warnings},
+    )
+
+
+def _load_preflight_cache(paths: dict[str, Path], config_hash: str) -> tuple[dict, dict, list[str]] | None:
+    """Return (resolved, versions, warnings) from the last successful preflight if nothing it checked has changed."""
+    if not paths["input_csv"].exists():
+        return None
+    try:
+        cached = jsonio.loads(paths["preflight_cache"].read_bytes())
+    except (OSError, ValueError):
+        return None
+    resolved = cached.get("resolved") if isinstance(cached, dict) else None
+    if not isinstance(resolved, dict) or cached.get("config_hash") != config_hash:
+        return None
+    if cached.get("stamps") != _preflight_stamps(resolved):
+        return None
+    return resolved, cached.get("versions") or {}, list(cached.get("warnings") or [])
+
+
 def _write_preflight_log(paths: dict[str, Path], run_id: str, config_hash: str, resolved: dict, versions: dict, warnings: list[str]) -> None:
     lines = [
         f"run_id={run_id}",
@@ -318,51 +512,104 @@ def _write_preflight_log(paths: dict[str, Path], run_id: str, config_hash: str,
 
 
 def _read_input_count(input_csv: Path) -> int:
+    """Count data rows in input.csv; equivalent to len(list(csv.DictReader(f)))."""
     if not input_csv.exists():
         return 0
+    # Count lines in raw chunks. The first line is always the header; blank lines after it
+    # are skipped, as DictReader does. Quoted fields may span lines and a lone CR is a line
+    # break to csv, so either one falls back to the csv module.
+    newlines = blanks = 0
+    last = b""
+    with input_csv.open("rb") as f:
+        for buf in iter(lambda: f.read(1 << 20), b""):
+            if b'"' in buf:
+                break
+            if b"\r" in buf:
+                crlf = buf.count(b"\r\n")
+                if buf.count(b"\r") != crlf:
+                    break
+                if crlf:
+                    buf = buf.replace(b"\r\n", b"\n")
+            newlines += buf.count(b"\n")
+            blanks += last == b"\n" and buf[:1] == b"\n"
+            last = buf[-1:]
+            while b"\n\n" in buf:
+                collapsed = buf.replace(b"\n\n", b"\n")
+                blanks += len(buf) - len(collapsed)
+                buf = collapsed
+        else:
+            # "\n\n" pairs count blank lines after the first; the first line is the header.
+            return max(newlines + (last not in (b"", b"\n")) - blanks - 1, 0)
     with input_csv.open("r", encoding="utf-8", newline="") as f:
         return sum(1 for _ in csv.DictReader(f))
 
 
+_ADMET_PASS_VALUES = frozenset({"PASS", "PASSED", "OK", "TRUE", "1", "Y", "YES"})
+_DONE_VALUES = frozenset({"DONE", "OK", "SUCCESS", "PASSED", "PASS"})
+_FAILED_VALUES = frozenset({"FAIL", "FAILED", "ERROR"})
+
+_STATUS_DONE, _STATUS_FAILED, _STATUS_ADMET_PASS = 1, 2, 4
+
+
+class _StatusClasses(dict):
+    """Raw manifest status value -> category bits; each distinct spelling is normalized once."""
+
+    def __missing__(self, value) -> int:
+        s = str(value or "").strip().upper()
+        bits = (
+            (_STATUS_DONE if s in _DONE_VALUES else 0)
+            | (_STATUS_FAILED if s in _FAILED_VALUES else 0)
+            | (_STATUS_ADMET_PASS if s in _ADMET_PASS_VALUES else 0)
+        )
+        if len(self) < 4096:
+            self[value] = bits
+        return bits
+
+
+_STATUS_CLASSES = _StatusClasses()
+
+
 def is_admet_pass(value) -> bool:
     """Normalize legacy/current ADMET pass values from manifest rows."""
     if value is None:
         return False
-    s = str(value).strip().upper()
-    return s in {"PASS", "PASSED", "OK", "TRUE", "1", "Y", "YES"}
-
-
+    return str(value).strip().upper() in _ADMET_PASS_VALUES
 
 
 def is_done(value) -> bool:
     if value is None:
         return False
-    s = str(value).strip().upper()
-    return s in {"DONE", "OK", "SUCCESS", "PASSED", "PASS"}
+    return str(value).strip().upper() in _DONE_VALUES
 
 
 def is_failed(value) -> bool:
     if value is None:
         return False
-    s = str(value).strip().upper()
-    return s in {"FAIL", "FAILED", "ERROR"}
+    return str(value).strip().upper() in _FAILED_VALUES
 
 
-def _build_result_summary(paths: dict[str, Path]) -> dict:
-    rows = read_manifest(paths["manifest_csv"])
+def _build_result_summary(paths: dict[str, Path], rows: list[dict] | None = None) -> dict:
+    if rows is None:
+        rows = read_manifest(paths["manifest_csv"])
 
     total_rows = len(rows)
     # Module 2/3 failures are expected for some SMILES; report as funnel counts, not fatal by default.
-    admet_pass = sum(1 for r in rows if is_admet_pass(r.get("admet_status")))
+    admet_pass = sdf_done = sdf_failed = pdbqt_done = pdbqt_failed = vina_done = vina_failed = 0
+    classes = _STATUS_CLASSES
+    for r in rows:
+        if classes[r.get("admet_status")] & _STATUS_ADMET_PASS:
+            admet_pass += 1
+        c = classes[r.get("sdf_status")]
+        sdf_done += c & _STATUS_DONE
+        sdf_failed += (c & _STATUS_FAILED) >> 1
+        c = classes[r.get("pdbqt_status")]
+        pdbqt_done += c & _STATUS_DONE
+        pdbqt_failed += (c & _STATUS_FAILED) >> 1
+        c = classes[r.get("vina_status")]
+        vina_done += c & _STATUS_DONE
+        vina_failed += (c & _STATUS_FAILED) >> 1
     admet_fail = total_rows - admet_pass
 
-    sdf_done = sum(1 for r in rows if is_done(r.get("sdf_status")))
-    sdf_failed = sum(1 for r in rows if is_failed(r.get("sdf_status")))
-    pdbqt_done = sum(1 for r in rows if is_done(r.get("pdbqt_status")))
-    pdbqt_failed = sum(1 for r in rows if is_failed(r.get("pdbqt_status")))
-    vina_done = sum(1 for r in rows if is_done(r.get("vina_status")))
-    vina_failed = sum(1 for r in rows if is_failed(r.get("vina_status")))
-
     return {
         "input_rows": _read_input_count(paths["input_csv"]),
         "admet_pass": admet_pass,
@@ -384,6 +631,34 @@ def _build_result_summary(paths: dict[str, Path]) -> dict:
     }
 
 
+_MODULE_STATUS_FIELDS = {
+    "module1_admet": "admet_status",
+    "module2_build3d": "sdf_status",
+    "module3_meeko": "pdbqt_status",
+    "module4_docking": "vina_status",
+}
+
+
+def _module_is_complete_for_all_ligands(paths: dict[str, Path], module_name: str, input_ids: set[str] | None = None) -> bool:
+    """Resume shortcut: every input ligand already has a done status for this module.
+
+    Conservative by design; anything else falls through to the work plan.
+    """
+    if input_ids is None:
+        input_ids = _input_ids(paths)
+    if not input_ids:
+        return False
+    field = _MODULE_STATUS_FIELDS[module_name]
+    remaining = set(input_ids)
+    classes = _STATUS_CLASSES
+    for r in read_manifest(paths["manifest_csv"]):
+        if classes[r.get(field)] & _STATUS_DONE:
+            remaining.discard(str(r.get("id") or "").strip())
+            if not remaining:
+                return True
+    return False
+
+
 def _archive_previous(paths: dict[str, Path]) -> None:
     current = read_run_status(paths["status_json"])
     rid = current.get("run_id")
@@ -449,12 +724,18 @@ def _input_ids(paths: dict[str, Path]) -> set[str]:
     return ids
 
 
-def _stamp_manifest_config_hash(paths: dict[str, Path], config_hash: str) -> None:
+def _stamp_manifest_config_hash(paths: dict[str, Path], config_hash: str) -> list[dict]:
+    """Stamp config_hash on every manifest row; returns the stamped rows for reuse."""
     rows = read_manifest(paths["manifest_csv"])
+    changed = False
     for r in rows:
-        r["config_hash"] = config_hash
-    if rows:
+        if r.get("config_hash") != config_hash:
+            r["config_hash"] = config_hash
+            changed = True
+    # An unchanged config (the usual resume/re-run) leaves the manifest untouched.
+    if changed:
         write_manifest(paths["manifest_csv"], rows)
+    return rows
 
 
 def _stamp_stage_fingerprints(paths: dict[str, Path], resolved: dict, versions: dict, config_hash: str, module_name: str, only_ids: set[str] | None = None) -> None:
@@ -534,14 +815,19 @@ def _apply_backfill_updates(paths: dict[str, Path], updates: dict[str, dict[str,
         write_manifest(paths["manifest_csv"], rows)
 
 
-def _run_module(module_name: str, project_dir: Path, logs_dir: Path, resolved: dict, config_hash: str, only_ids: set[str] | None = None):
-    if module_name == "module1_admet":
-        return admet.run(project_dir, logs_dir, only_ids=only_ids)
-    if module_name == "module2_build3d":
-        return build3d.run(project_dir, logs_dir, only_ids=only_ids)
-    if module_name == "module3_meeko":
-        return meeko.run(project_dir, logs_dir, only_ids=only_ids)
+def _adapter(name: str):
+    # Adapters are imported on first use; status/plan/export never load them.
+    return importlib.import_module(f"moldockpipe.adapters.{name}")
+
+
+def __getattr__(name: str):
+    # Keeps `engine.admet`, `engine.docking_cpu`, ... working as lazy attributes.
+    if name in _ADAPTER_NAMES:
+        return _adapter(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
+def _run_docking(project_dir: Path, logs_dir: Path, resolved: dict, config_hash: str, only_ids: set[str] | None = None):
     docking = resolved.get("docking_params")
     box = resolved.get("box")
     dock = None
@@ -557,20 +843,48 @@ def _run_module(module_name: str, project_dir: Path, logs_dir: Path, resolved: d
             "num_modes": docking["num_modes"],
             "energy_range": docking["energy_range"],
         }
-    return docking_gpu.run(project_dir, logs_dir, vina_path=resolved.get("vina_gpu_path"), receptor_path=resolved.get("receptor_path"), docking_params=dock, config_hash=config_hash, only_ids=only_ids) if resolved.get("vina_gpu_path") else docking_cpu.run(project_dir, logs_dir, vina_path=resolved.get("vina_cpu_path"), receptor_path=resolved.get("receptor_path"), docking_params=dock, config_hash=config_hash, only_ids=only_ids)
+    # Preflight resolves exactly one of the two binaries from the (already lower-cased) docking_mode.
+    if resolved.get("vina_gpu_path"):
+        runner, vina_path = _adapter("docking_gpu").run, resolved["vina_gpu_path"]
+    else:
+        runner, vina_path = _adapter("docking_cpu").run, resolved.get("vina_cpu_path")
+    return runner(project_dir, logs_dir, vina_path=vina_path, receptor_path=resolved.get("receptor_path"), docking_params=dock, config_hash=config_hash, only_ids=only_ids)
+
+
+# Adapters are looked up at call time (not bound here) so tests can monkeypatch `engine.admet.run` etc.
+_MODULE_RUNNERS = {
+    "module1_admet": lambda project_dir, logs_dir, resolved, config_hash, only_ids=None: _adapter("admet").run(project_dir, logs_dir, only_ids=only_ids),
+    "module2_build3d": lambda project_dir, logs_dir, resolved, config_hash, only_ids=None: _adapter("build3d").run(project_dir, logs_dir, only_ids=only_ids),
+    "module3_meeko": lambda project_dir, logs_dir, resolved, config_hash, only_ids=None: _adapter("meeko").run(project_dir, logs_dir, only_ids=only_ids),
+    "module4_docking": _run_docking,
+}
+
+
+def _run_module(module_name: str, project_dir: Path, logs_dir: Path, resolved: dict, config_hash: str, only_ids: set[str] | None = None):
+    return _MODULE_RUNNERS[module_name](project_dir, logs_dir, resolved, config_hash, only_ids=only_ids)
 
 
 def _execute(project_dir: Path, cli_config: dict | None, resume_mode: bool, *, force: bool = False, rerun_failed_only: bool = False, from_module: int = 1) -> dict:
     paths = _project_paths(project_dir)
     _ensure_dirs(paths)
     raw_config, warnings = _load_project_config(paths["project"], cli_config)
-    config_snapshot = json.loads(json.dumps(raw_config))
+    config_snapshot = _fast_copy(raw_config)
     config_hash = _config_hash(config_snapshot)
     run_id = _run_id(config_hash)
 
-    try:
-        resolved, versions = _validate_contract(paths, raw_config, warnings)
-        _ensure_run_requirements(paths, versions)
+    try:
+        # A resume re-validates the same snapshot; reuse the previous preflight when nothing changed.
+        cached = _load_preflight_cache(paths, config_hash) if resume_mode else None
+        if cached is not None:
+            resolved, versions, preflight_warnings = cached
+            warnings.extend(preflight_warnings)
+        else:
+            config_warning_count = len(warnings)
+            resolved, versions = _validate_contract(paths, raw_config, warnings)
+            preflight_warnings = warnings[config_warning_count:]
+        _ensure_run_requirements(paths, versions)
+        if cached is None:
+            _save_preflight_cache(paths, config_hash, resolved, versions, preflight_warnings)
         _write_preflight_log(paths, run_id, config_hash, resolved, versions, warnings)
     except PreflightError as exc:
         _archive_previous(paths)
@@ -598,10 +912,25 @@ def _execute(project_dir: Path, cli_config: dict | None, resume_mode: bool, *, f
     status["completed_modules"] = sorted(completed)
     write_json_atomic(paths["status_json"], status)
 
-    for idx, module_name in enumerate(MODULES, start=1):
+    # `status` is the single in-memory copy for this run; it is written whole, never re-read.
+    last_flush = time.monotonic()
+
+    def flush_status(force: bool = True) -> None:
+        nonlocal last_flush
+        now = time.monotonic()
+        if not force and now - last_flush < STATUS_FLUSH_MIN_S:
+            return
+        status["updated_at"] = _iso_now()
+        write_run_status(paths["status_json"], status)
+        last_flush = now
+
+    module_total = len(MODULES)
+    # input.csv is not modified during a run; read its ids once for the force/resume paths.
+    input_ids = _input_ids(paths) if (force or resume_mode) else set()
+    for idx, module_name, label, start_percent, end_percent in _MODULE_META:
         if module_name in completed:
             continue
-        if resume_mode and _module_is_complete_for_all_ligands(paths, module_name):
+        if resume_mode and _module_is_complete_for_all_ligands(paths, module_name, input_ids):
             completed.add(module_name)
             status["completed_modules"] = sorted(completed)
             continue
@@ -619,16 +948,11 @@ def _execute(project_dir: Path, cli_config: dict | None, resume_mode: bool, *, f
                 "module4_docking": plan.module4_ids,
             }.get(module_name, set())
             if force:
-                pending_ids = _input_ids(paths)
+                pending_ids = set(input_ids)
             elif rerun_failed_only:
-                rows = read_manifest(paths["manifest_csv"])
-                failed_by_module = {
-                    "module1_admet": {str((r.get("id") or "")).strip() for r in rows if is_failed(r.get("admet_status"))},
-                    "module2_build3d": {str((r.get("id") or "")).strip() for r in rows if is_failed(r.get("sdf_status"))},
-                    "module3_meeko": {str((r.get("id") or "")).strip() for r in rows if is_failed(r.get("pdbqt_status"))},
-                    "module4_docking": {str((r.get("id") or "")).strip() for r in rows if is_failed(r.get("vina_status"))},
-                }
-                pending_ids = pending_ids.intersection(failed_by_module.get(module_name, set()))
+                field = _MODULE_STATUS_FIELDS[module_name]
+                failed_ids = {str((r.get("id") or "")).strip() for r in read_manifest(paths["manifest_csv"]) if is_failed(r.get(field))}
+                pending_ids = pending_ids.intersection(failed_ids)
         if not force and len(pending_ids) == 0:
             status["modules"][module_name].update({"status": "skipped", "started_at": None, "finished_at": None, "duration_seconds": 0.0})
             completed.add(module_name)
@@ -639,29 +963,29 @@ def _execute(project_dir: Path, cli_config: dict | None, resume_mode: bool, *, f
                 "progress": {
                     "current_module": module_name,
                     "module_index": idx,
-                    "module_total": len(MODULES),
-                    "percent": int((idx / len(MODULES)) * 100),
+                    "module_total": module_total,
+                    "percent": end_percent,
                 },
             })
-            update_run_status(paths["status_json"], **status)
+            flush_status(force=False)
             continue
 
         started = datetime.now(timezone.utc)
         status.update(
             {
                 "phase": module_name,
-                "phase_detail": f"{MODULE_LABELS[module_name]} ({len(pending_ids)} pending)",
+                "phase_detail": f"{label} ({len(pending_ids)} pending)",
                 "progress": {
                     "current_module": module_name,
                     "module_index": idx,
-                    "module_total": len(MODULES),
-                    "percent": int(((idx - 1) / len(MODULES)) * 100),
+                    "module_total": module_total,
+                    "percent": start_percent,
                 },
             }
         )
         status["modules"][module_name]["status"] = "running"
         status["modules"][module_name]["started_at"] = started.isoformat().replace("+00:00", "Z")
-        update_run_status(paths["status_json"], **status)
+        flush_status()
 
         result = _run_module(module_name, paths["project"], paths["engine_logs_dir"], resolved, config_hash, only_ids=pending_ids if pending_ids else None)
 
@@ -678,8 +1002,7 @@ def _execute(project_dir: Path, cli_config: dict | None, resume_mode: bool, *, f
                 "duration_seconds": round(duration, 3),
             }
         )
-        status["history"] = [
-            *status.get("history", []),
+        status["history"].append(
             {
                 "run_id": run_id,
                 "module": module_name,
@@ -689,8 +1012,8 @@ def _execute(project_dir: Path, cli_config: dict | None, resume_mode: bool, *, f
                 "started_at": status["modules"][module_name]["started_at"],
                 "ended_at": status["modules"][module_name]["finished_at"],
                 "duration_seconds": status["modules"][module_name]["duration_seconds"],
-            },
-        ]
+            }
+        )
 
         if not acceptable:
             status.update(
@@ -704,15 +1027,14 @@ def _execute(project_dir: Path, cli_config: dict | None, resume_mode: bool, *, f
                     "progress": {
                         "current_module": module_name,
                         "module_index": idx,
-                        "module_total": len(MODULES),
-                        "percent": int(((idx - 1) / len(MODULES)) * 100),
+                        "module_total": module_total,
+                        "percent": start_percent,
                     },
                 }
             )
-            status["result_summary"] = _build_result_summary(paths)
-            _stamp_manifest_config_hash(paths, config_hash)
-            status = update_run_status(paths["status_json"], **status)
-            _archive_current(paths, status, config_snapshot)
+            status["result_summary"] = _build_result_summary(paths, _stamp_manifest_config_hash(paths, config_hash))
+            flush_status()
+            _archive_current(paths, status, config_snapshot)
             return {"ok": False, "exit_code": 1, "failed_module": module_name, "status": status, "results": status["history"]}
 
         completed.add(module_name)
@@ -720,10 +1042,10 @@ def _execute(project_dir: Path, cli_config: dict | None, resume_mode: bool, *, f
         status["progress"] = {
             "current_module": module_name,
             "module_index": idx,
-            "module_total": len(MODULES),
-            "percent": int((idx / len(MODULES)) * 100),
+            "module_total": module_total,
+            "percent": end_percent,
         }
-        update_run_status(paths["status_json"], **status)
+        flush_status(force=False)
 
         if module_name == "module4_docking" and rc == 2:
             status.update(
@@ -736,10 +1058,9 @@ def _execute(project_dir: Path, cli_config: dict | None, resume_mode: bool, *, f
                     "finished_at": _iso_now(),
                 }
             )
-            status["result_summary"] = _build_result_summary(paths)
-            _stamp_manifest_config_hash(paths, config_hash)
-            status = update_run_status(paths["status_json"], **status)
-            _archive_current(paths, status, config_snapshot)
+            status["result_summary"] = _build_result_summary(paths, _stamp_manifest_config_hash(paths, config_hash))
+            flush_status()
+            _archive_current(paths, status, config_snapshot)
             return {"ok": True, "exit_code": 2, "warnings": ["Module 4 completed with per-ligand failures."], "status": status, "results": status["history"]}
 
     status.update(
@@ -753,10 +1074,9 @@ def _execute(project_dir: Path, cli_config: dict | None, resume_mode: bool, *, f
             "progress": {"current_module": MODULES[-1], "module_index": len(MODULES), "module_total": len(MODULES), "percent": 100},
         }
     )
-    status["result_summary"] = _build_result_summary(paths)
-    _stamp_manifest_config_hash(paths, config_hash)
-    status = update_run_status(paths["status_json"], **status)
-    _archive_current(paths, status, config_snapshot)
+    status["result_summary"] = _build_result_summary(paths, _stamp_manifest_config_hash(paths, config_hash))
+    flush_status()
+    _archive_current(paths, status, config_snapshot)
     return {"ok": True, "exit_code": 0, "status": status, "results": status["history"]}
 
 
@@ -768,7 +1088,7 @@ def preflight_validate(project_dir: Path, config: dict | None = None) -> dict:
     paths = _project_paths(project_dir)
     _ensure_dirs(paths)
     raw_config, warnings = _load_project_config(paths["project"], config)
-    config_snapshot = json.loads(json.dumps(raw_config))
+    config_snapshot = _fast_copy(raw_config)
     config_hash = _config_hash(config_snapshot)
     run_id = _run_id(config_hash)
     try:
@@ -805,7 +1125,7 @@ def status(project_dir: Path) -> dict:
     if not paths["status_json"].exists():
         return {"ok": False, "exit_code": 1, "message": "No runs found", "status": None}
     try:
-        rs = json.loads(paths["status_json"].read_text(encoding="utf-8"))
+        rs = jsonio.loads(paths["status_json"].read_bytes())
     except Exception as exc:
         return {"ok": False, "exit_code": 1, "message": f"Invalid run_status.json: {exc}", "status": None}
     return {"ok": True, "exit_code": 0, "status": rs}
@@ -818,7 +1138,7 @@ def plan(project_dir: Path, config: dict | None = None) -> dict:
         resolved, versions = _validate_contract(paths, raw_config, warnings)
     except PreflightError as exc:
         return {"ok": False, "exit_code": 1, "message": str(exc), "plan": None}
-    cfg_hash = _config_hash(json.loads(json.dumps(raw_config)))
+    cfg_hash = _config_hash(raw_config)
     wp = compute_work_plan(
         paths["project"],
         resolved=resolved,
@@ -849,7 +1169,7 @@ def validate_project(project_dir: Path, config: dict | None = None) -> dict:
         resolved = {"receptor_path": None, "vina_cpu_path": None, "vina_gpu_path": None, "box": None, "docking_params": None}
         versions = {}
 
-    cfg_hash = _config_hash(json.loads(json.dumps(raw_config)))
+    cfg_hash = _config_hash(raw_config)
     wp = compute_work_plan(
         paths["project"],
         resolved=resolved,
@@ -894,8 +1214,6 @@ def validate_project(project_dir: Path, config: dict | None = None) -> dict:
 
 
 def export_report(project_dir: Path) -> dict:
-    rows = read_manifest((project_dir / "state" / "manifest.csv").resolve())
     out = (project_dir / "results" / "engine_report.csv").resolve()
-    out.parent.mkdir(parents=True, exist_ok=True)
-    write_manifest(out, rows)
-    return {"rows": len(rows), "report": str(out)}
+    rows = copy_manifest((project_dir / "state" / "manifest.csv").resolve(), out)
+    return {"rows": rows, "report": str(out)}
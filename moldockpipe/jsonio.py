@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import json
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+
+def dumps(obj, pretty: bool = False) -> str:
+    """Serialize to JSON text; uses orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    return json.dumps(obj, indent=2 if pretty else None)
+
+
+def dumpb(obj, pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, skipping the str round-trip when orjson is available."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if pretty else None).encode("utf-8")
+
+
+def loads(data: str | bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -2,23 +2,24 @@ from __future__ import annotations
 
 import argparse
 import csv
-import json
 import os
 import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+from moldockpipe.jsonio import dumpb, loads
+
 
 TERMINAL_PHASES = {"completed", "failed", "validation_failed"}
 
 
 def _iso_now() -> str:
-    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 def _read_json(path: Path) -> dict | None:
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return loads(path.read_bytes())
     except Exception:
         return None
 
@@ -29,7 +30,7 @@ def _write_json_atomic(path: Path, payload: dict) -> None:
     for attempt in range(10):
         tmp = path.with_name(f"{path.name}.{os.getpid()}.{attempt}.tmp")
         try:
-            tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            tmp.write_bytes(dumpb(payload, pretty=True))
             os.replace(tmp, path)
             return
         except PermissionError as exc:
@@ -283,7 +284,7 @@ def run_watcher(project: Path, run_id: str, interval_ms: int) -> int:
         except Exception as exc:
             payload["message"] = f"{payload.get('message', '')} write_error={exc}".strip()
             try:
-                progress_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+                progress_path.write_bytes(dumpb(payload, pretty=True))
             except Exception:
                 pass
         last_payload = payload
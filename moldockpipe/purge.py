@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import json
+import shutil
 from pathlib import Path
 
 import click
 
+from moldockpipe.jsonio import dumpb
 from moldockpipe.state.manifest import MANIFEST_FIELDS
 
 
@@ -22,6 +23,20 @@ DELETE_EXTS = {".smi", ".sdf", ".pdbqt", ".log", ".tmp"}
 
 KEEP_FILES = {"VinaConfig.txt"}
 
+# Append-only sidecars that would otherwise outlive a purge (Module 4a/4b manifest deltas).
+JSONL_LOGS = ["state/manifest.jsonl"]
+
+# Derived caches under state/; each is rebuilt on the next run.
+STATE_CACHES = [
+    "state/run_yml_cache.json",
+    "state/preflight_cache.json",
+    "state/current_config.json",
+    "state/pose_index.json",
+    "state/validation_cache.json",
+    "state/digest_cache.json",
+    "state/vina_maps",
+]
+
 CSV_HEADERS = {
     "state/manifest.csv": list(MANIFEST_FIELDS),
     "results/summary.csv": [
@@ -53,10 +68,30 @@ def reset_run_status(file: Path) -> None:
         "finished_at": None,
         "history": [],
     }
-    file.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    file.write_bytes(dumpb(payload, pretty=True))
     click.echo(f"[JSON] Reset: {file}")
 
 
+def reset_jsonl(file: Path) -> None:
+    if not file.exists():
+        return
+    file.write_text("", encoding="utf-8")
+    click.echo(f"[JSONL] Reset: {file}")
+
+
+def delete_path(path: Path) -> None:
+    if not path.exists():
+        return
+    click.echo(f"[DEL] {path}")
+    try:
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+    except Exception as exc:  # pragma: no cover
+        click.echo(f"  [WARN] Could not delete {path}: {exc}")
+
+
 def clean_folder(folder: Path) -> None:
     if not folder.exists() or not folder.is_dir():
         return
@@ -82,6 +117,7 @@ def confirm_action(base: Path, *, confirm1: str | None = None, confirm2: str | N
     click.echo(f" - Clean folders: {', '.join(FOLDERS_TO_CLEAN)}")
     click.echo(" - Delete .smi, .sdf, .pdbqt, .log, .tmp files")
     click.echo(" - Truncate or recreate manifest and result CSVs")
+    click.echo(" - Delete cached state (preflight, digests, pose index, Vina grid maps)")
     click.echo(" - Reset run_status.json and clear logs\n")
 
     if confirm1 is None:
@@ -123,5 +159,9 @@ def purge_project(base: Path, *, confirm1: str | None = None, confirm2: str | No
         truncate_or_create_csv(base / rel, headers)
 
     reset_run_status(base / "state" / "run_status.json")
+    for rel in JSONL_LOGS:
+        reset_jsonl(base / rel)
+    for rel in STATE_CACHES:
+        delete_path(base / rel)
     click.echo("\nPipeline cleaned. CSV headers preserved (or re-created), all other data cleared.")
     return {"ok": True, "exit_code": 0, "message": "purged", "project_dir": str(base)}
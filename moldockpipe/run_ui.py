@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-import json
+import ctypes
+import os
+import selectors
+import sys
 import time
 from pathlib import Path
+from typing import Callable
 
 import click
 
+from moldockpipe.jsonio import loads
+
 TERMINAL_DONE = {"completed", "failed", "validation_failed"}
 
 
@@ -13,8 +19,8 @@ def _read_status(status_path: Path) -> dict | None:
     if not status_path.exists():
         return None
     try:
-        return json.loads(status_path.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
+        return loads(status_path.read_bytes())
+    except (ValueError, OSError):
         return None
 
 
@@ -83,33 +89,115 @@ def _render_block(status: dict, elapsed_s: float) -> str:
     return "\n".join(lines)
 
 
-def watch_run_status(status_path: Path, poll_interval_s: float = 0.35, startup_wait_s: float = 8.0) -> dict | None:
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+
+
+class _StatusEvents:
+    """Wake early when run_status.json is rewritten.
+
+    Linux only: an inotify watch on the status directory (the engine replaces
+    the file atomically, hence IN_MOVED_TO/IN_CLOSE_WRITE). Elsewhere, or if
+    inotify is unavailable, wait() is a plain sleep.
+    """
+
+    def __init__(self, status_path: Path):
+        self._folder = status_path.parent
+        self._sel = selectors.DefaultSelector()
+        self._inotify_fd: int | None = None
+        self._supported = sys.platform.startswith("linux")
+        self._watch_folder()
+
+    def _watch_folder(self) -> None:
+        # The engine may create state/ only after we start; retried on each wait().
+        if not self._supported or self._inotify_fd is not None or not self._folder.is_dir():
+            return
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError, TypeError):
+            self._supported = False
+            return
+        if fd < 0:
+            return
+        if libc.inotify_add_watch(fd, os.fsencode(self._folder), _IN_CLOSE_WRITE | _IN_MOVED_TO) < 0:
+            os.close(fd)
+            return
+        self._inotify_fd = fd
+        self._sel.register(fd, selectors.EVENT_READ)
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to `timeout`; False only when the folder is watched and nothing was written."""
+        if self._inotify_fd is None:
+            self._watch_folder()
+            if self._inotify_fd is not None:
+                return True  # writes before the watch existed were not seen
+            # Folder not created yet: re-check soon rather than sleeping a whole interval.
+            time.sleep(min(timeout, 0.2) if self._supported else timeout)
+            return True
+        if not self._sel.select(timeout):
+            return False
+        try:
+            while os.read(self._inotify_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        self._sel.close()
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+
+
+def watch_run_status(
+    status_path: Path,
+    poll_interval_s: float = 0.35,
+    startup_wait_s: float = 8.0,
+    stop_when: Callable[[], bool] | None = None,
+) -> dict | None:
+    """Render run_status.json until it reports a terminal status or `stop_when()` is true.
+
+    The block is redrawn at least every `poll_interval_s` (for the elapsed clock)
+    and immediately when the status file changes. Where file events are
+    available, the file is only re-read after a write to its folder.
+    """
     start = time.monotonic()
     last = None
     final = None
+    status = None
+    changed = True
+    events = _StatusEvents(status_path)
 
-    while True:
-        now = time.monotonic()
-        status = _read_status(status_path)
-        if status is not None:
-            final = status
-            block = _render_block(status, elapsed_s=(now - start))
-            if block != last:
-                click.echo("\x1b[2J\x1b[H" + block, nl=False)
-                click.echo()
-                last = block
-            if str(status.get("status", "")).lower() in TERMINAL_DONE:
-                break
-        else:
-            if (now - start) <= startup_wait_s:
-                msg = f"Waiting for run status file: {status_path}"
-                if msg != last:
-                    click.echo("\x1b[2J\x1b[H" + msg, nl=False)
+    try:
+        while True:
+            stopped = stop_when is not None and stop_when()
+            now = time.monotonic()
+            if changed or stopped:
+                status = _read_status(status_path)
+            if status is not None:
+                final = status
+                block = _render_block(status, elapsed_s=(now - start))
+                if block != last:
+                    click.echo("\x1b[2J\x1b[H" + block, nl=False)
                     click.echo()
-                    last = msg
+                    last = block
+                if str(status.get("status", "")).lower() in TERMINAL_DONE:
+                    break
             else:
-                break
-        time.sleep(poll_interval_s)
+                if (now - start) <= startup_wait_s:
+                    msg = f"Waiting for run status file: {status_path}"
+                    if msg != last:
+                        click.echo("\x1b[2J\x1b[H" + msg, nl=False)
+                        click.echo()
+                        last = msg
+                else:
+                    break
+            if stopped:
+                break  # the status above was read after the writer had finished
+            changed = events.wait(poll_interval_s)
+    finally:
+        events.close()
 
     return final
 
@@ -1,8 +1,9 @@
-from .manifest import MANIFEST_FIELDS, read_manifest, write_manifest
+from .manifest import MANIFEST_FIELDS, copy_manifest, read_manifest, write_manifest
 from .run_status import read_run_status, update_run_status, write_json_atomic, write_run_status
 
 __all__ = [
     "MANIFEST_FIELDS",
+    "copy_manifest",
     "read_manifest",
     "write_manifest",
     "read_run_status",
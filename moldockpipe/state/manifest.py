@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import csv
+import json
+import os
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
 MANIFEST_FIELDS = [
@@ -28,7 +31,7 @@ MANIFEST_FIELDS = [
     "vina_receptor_sha1",
     "vina_config_hash",
     "config_hash",
-    "receptor_sha1",
+    "receptor_digest",
     "tools_rdkit",
     "tools_meeko",
     "tools_vina",
@@ -36,28 +39,113 @@ MANIFEST_FIELDS = [
     "updated_at",
 ]
 
+# Columns renamed since older manifests were written: old name -> current name.
+RENAMED_FIELDS = {"receptor_sha1": "receptor_digest"}
+
+
+def _rename_legacy(row: dict) -> dict:
+    for old, new in RENAMED_FIELDS.items():
+        if old in row:
+            value = row.pop(old)
+            if not row.get(new):
+                row[new] = value
+    return row
+
+
+# Parsed manifests keyed by path; reused while (inode, size, mtime_ns) of the CSV and of
+# its delta log are unchanged. Every CSV writer replaces the file atomically, so a rewrite
+# always changes the inode; the delta log only grows.
+_READ_CACHE: dict[str, tuple[tuple, list[dict]]] = {}
+
+
+def delta_log_path(path: Path) -> Path:
+    """Docking modules append per-ligand updates to manifest.jsonl and fold them into the CSV at exit."""
+    return path.with_suffix(".jsonl")
+
+
+def _stat_sig(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
 
 def read_manifest(path: Path) -> list[dict]:
-    if not path.exists():
+    """Manifest rows with any not-yet-compacted delta log (left by an interrupted docking run) applied."""
+    delta = delta_log_path(path)
+    sig = (_stat_sig(path), _stat_sig(delta))
+    if sig == (None, None):
         return []
+    key = str(path)
+    hit = _READ_CACHE.get(key)
+    if hit is None or hit[0] != sig:
+        rows = _parse_manifest(path) if sig[0] is not None else []
+        if sig[1] is not None:
+            rows = _apply_deltas(rows, delta)
+        hit = (sig, rows)
+        _READ_CACHE[key] = hit
+    # Callers edit rows in place before writing them back; hand out copies.
+    return [dict(row) for row in hit[1]]
+
+
+def _apply_deltas(rows: list[dict], delta: Path) -> list[dict]:
+    by_id = {row.get("id", ""): row for row in rows}
+    with delta.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                update = json.loads(line)
+            except ValueError:
+                continue  # torn last line of a killed run
+            if not isinstance(update, dict) or not update.get("id"):
+                continue
+            _rename_legacy(update)
+            row = by_id.get(update["id"])
+            if row is None:
+                row = by_id[update["id"]] = {f: "" for f in MANIFEST_FIELDS}
+                rows.append(row)
+            row.update({k: "" if v is None else str(v) for k, v in update.items() if k in MANIFEST_FIELDS})
+    return rows
+
+
+def _iter_manifest(handle) -> Iterator[dict]:
+    for row in csv.DictReader(handle):
+        cleaned={}
+        for k,v in dict(row).items():
+            sv="" if v is None else str(v)
+            cleaned[k]="" if sv.strip().lower() in {"nan","none"} else sv
+        _rename_legacy(cleaned)
+        for f in MANIFEST_FIELDS:
+            cleaned.setdefault(f, "")
+        yield cleaned
+
+
+def _parse_manifest(path: Path) -> list[dict]:
     with path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        rows=[]
-        for row in reader:
-            cleaned={}
-            for k,v in dict(row).items():
-                sv="" if v is None else str(v)
-                cleaned[k]="" if sv.strip().lower() in {"nan","none"} else sv
-            for f in MANIFEST_FIELDS:
-                cleaned.setdefault(f, "")
-            rows.append(cleaned)
-        return rows
-
-
-def write_manifest(path: Path, rows: list[dict]) -> None:
+        return list(_iter_manifest(handle))
+
+
+def copy_manifest(src: Path, dst: Path) -> int:
+    """Rewrite `src` to `dst` in canonical manifest form one row at a time; returns the row count."""
+    if delta_log_path(src).exists():
+        return write_manifest(dst, read_manifest(src))
+    if not src.exists():
+        return write_manifest(dst, [])
+    with src.open("r", encoding="utf-8", newline="") as handle:
+        return write_manifest(dst, _iter_manifest(handle))
+
+
+def write_manifest(path: Path, rows: Iterable[dict]) -> int:
+    """Replace the manifest with `rows`; a pending delta log is dropped since `rows` supersede it."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8", newline="") as handle:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8", newline="") as handle:
         writer = csv.DictWriter(handle, fieldnames=MANIFEST_FIELDS)
         writer.writeheader()
+        count = 0
         for row in rows:
             writer.writerow({field: row.get(field, "") for field in MANIFEST_FIELDS})
+            count += 1
+    os.replace(tmp, path)
+    delta_log_path(path).unlink(missing_ok=True)
+    return count
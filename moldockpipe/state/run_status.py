@@ -1,18 +1,19 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime, timezone
 from pathlib import Path
 
+from moldockpipe.jsonio import dumpb, loads
+
 
 def _now() -> str:
-    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 def write_json_atomic(path: Path, data: dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    tmp.write_bytes(dumpb(data, pretty=True))
     tmp.replace(path)
 
 
@@ -28,7 +29,7 @@ def read_run_status(path: Path) -> dict:
             "finished_at": None,
             "history": [],
         }
-    return json.loads(path.read_text(encoding="utf-8"))
+    return loads(path.read_bytes())
 
 
 def write_run_status(path: Path, data: dict) -> None:
@@ -0,0 +1,16 @@
+"""Stand-in for Vina-GPU: writes a three-model pose per staged ligand."""
+import os
+import sys
+
+args = sys.argv[1:]
+lig_dir = args[args.index("--ligand_directory") + 1]
+out_dir = args[args.index("--output_directory") + 1]
+model = (
+    "MODEL {n}\nREMARK VINA RESULT:    -7.{n}00      0.000      0.000\n"
+    + "ATOM      1  C   LIG     1       0.000   0.000   0.000  1.00  0.00     0.000 C\n" * 3
+    + "ENDMDL\n"
+)
+for name in sorted(os.listdir(lig_dir)):
+    if name.endswith(".pdbqt"):
+        with open(os.path.join(out_dir, name[:-6] + "_out.pdbqt"), "w") as f:
+            f.write("".join(model.format(n=n) for n in range(1, 4)))
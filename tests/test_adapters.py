@@ -1,23 +1,29 @@
+import importlib.util
+import os
+import signal
+import stat
 import sys
 from pathlib import Path
 from types import SimpleNamespace
 
+import pytest
+
 from moldockpipe.adapters import admet, docking_cpu
-from moldockpipe.adapters.common import run_script
+from moldockpipe.adapters.common import REPO_ROOT, run_script
 
 
 def test_adapter_invokes_subprocess_and_writes_logs(tmp_path, monkeypatch):
     called = {}
 
-    def fake_run(cmd, cwd, env, text, encoding, errors, capture_output, check):
+    def fake_popen(cmd, cwd, env, stdout, stderr):
         called["cmd"] = cmd
         called["cwd"] = cwd
         called["env"] = env
-        called["encoding"] = encoding
-        called["errors"] = errors
-        return SimpleNamespace(returncode=0, stdout="ok out", stderr="ok err")
+        stdout.write("ok out".encode("utf-8"))
+        stderr.write("ok err".encode("utf-8"))
+        return SimpleNamespace(wait=lambda: 0)
 
-    monkeypatch.setattr("moldockpipe.adapters.common.subprocess.run", fake_run)
+    monkeypatch.setattr("moldockpipe.adapters.common.subprocess.Popen", fake_popen)
     result = admet.run(tmp_path, tmp_path / "logs")
 
     assert result.ok
@@ -27,8 +33,6 @@ def test_adapter_invokes_subprocess_and_writes_logs(tmp_path, monkeypatch):
     assert called["cmd"][0] == sys.executable
     assert called["env"]["PYTHONUTF8"] == "1"
     assert called["env"]["PYTHONIOENCODING"] == "utf-8"
-    assert called["encoding"] == "utf-8"
-    assert called["errors"] == "replace"
 
 
 def test_subprocess_runner_handles_emoji_output(tmp_path, monkeypatch):
@@ -64,3 +68,50 @@ def test_docking_cpu_passes_explicit_vina(monkeypatch, tmp_path):
     assert captured["module"] == "module4a_cpu"
     assert captured["args"] == ["--vina", "C:/tools/vina.exe"]
     assert captured["env"]["MOLDOCK_VINA_CPU_PATH"] == "C:/tools/vina.exe"
+
+
+@pytest.mark.skipif(os.name != "posix", reason="fake Vina-GPU is launched through a shebang")
+def test_gpu_docking_launches_next_batch_before_harvesting(tmp_path, monkeypatch):
+    (tmp_path / "receptors").mkdir()
+    (tmp_path / "receptors" / "target_prepared.pdbqt").write_text("REMARK receptor\n")
+    (tmp_path / "prepared_ligands").mkdir()
+    for i in range(4):
+        (tmp_path / "prepared_ligands" / f"lig{i}.pdbqt").write_text(
+            "ATOM      1  C   LIG     1       0.000   0.000   0.000  1.00  0.00     0.000 C\nTORSDOF 0\n"
+        )
+    fake = tmp_path / "fake_vina_gpu"
+    fake.write_text(f"#!{sys.executable}\n" + (Path(__file__).parent / "fixtures" / "fake_vina_gpu.py").read_text())
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MOLDOCK_GPU_BATCH_SIZE", "2")
+    monkeypatch.delenv("MOLDOCK_NUM_GPUS", raising=False)
+    monkeypatch.delenv("MOLDOCK_ONLY_IDS_FILE", raising=False)
+    spec = importlib.util.spec_from_file_location("module4b_gpu", REPO_ROOT / "Module 4b (GPU)v3.py")
+    mod = importlib.util.module_from_spec(spec)
+    monkeypatch.setattr(signal, "signal", lambda *a: None)  # keep pytest's Ctrl+C handler
+    spec.loader.exec_module(mod)
+
+    events = []
+    start_batch, append_deltas = mod.start_batch, mod.append_manifest_deltas
+
+    def record_start(vgpu, cfg_file, lig_dir, *rest):
+        events.append(("launch", sorted(p.stem for p in lig_dir.iterdir())))
+        return start_batch(vgpu, cfg_file, lig_dir, *rest)
+
+    def record_deltas(manifest, ids):
+        ids = sorted(ids)
+        if ids:
+            events.append(("harvest", ids))
+        return append_deltas(manifest, ids)
+
+    monkeypatch.setattr(mod, "start_batch", record_start)
+    monkeypatch.setattr(mod, "append_manifest_deltas", record_deltas)
+    monkeypatch.setattr(sys, "argv", ["Module 4b (GPU)v3.py", "--vina", str(fake),
+                                      "--center_x", "0", "--center_y", "0", "--center_z", "0",
+                                      "--size_x", "20", "--size_y", "20", "--size_z", "20"])
+    mod.main()
+
+    # Batch 2 is launched before batch 1 is recorded, so parsing overlaps docking.
+    assert [kind for kind, _ in events] == ["launch", "launch", "harvest", "harvest"]
+    assert events[2][1] == events[0][1] and events[3][1] == events[1][1]
@@ -1,3 +1,4 @@
+import csv
 import json
 from pathlib import Path
 
@@ -499,3 +500,92 @@ def test_validate_project_reports_missing_pose(tmp_path, monkeypatch):
     res = engine.validate_project(tmp_path, {"docking_mode": "cpu"})
     assert res["ok"] is False
     assert res["validation"]["artifact_errors"]
+
+
+def test_resume_reuses_unchanged_preflight(tmp_path, monkeypatch):
+    _setup_project(tmp_path)
+    monkeypatch.setattr(engine, "_validate_contract", _fake_contract)
+    monkeypatch.setattr(engine, "_write_preflight_log", lambda *a, **k: None)
+    for name in ("admet", "build3d", "meeko", "docking_cpu"):
+        monkeypatch.setattr(getattr(engine, name), "run", lambda *a, **k: _ok_result(1))
+
+    assert engine.run(tmp_path, {"docking_mode": "cpu"})["exit_code"] == 1
+    assert (tmp_path / "state" / "preflight_cache.json").exists()
+
+    def contract_must_not_run(paths, raw_config, warnings):
+        raise engine.PreflightError("preflight re-run")
+
+    monkeypatch.setattr(engine, "_validate_contract", contract_must_not_run)
+    res = engine.resume(tmp_path)
+    assert res["exit_code"] == 1
+    assert res["failed_module"] == "module1_admet"
+
+    (tmp_path / "receptors" / "target_prepared.pdbqt").write_text("REMARK receptor v2\n", encoding="utf-8")
+    res = engine.resume(tmp_path)
+    assert res["exit_code"] == 3
+    assert res["error"] == "preflight re-run"
+
+
+def test_read_manifest_replays_and_compacts_delta_log(tmp_path):
+    (tmp_path / "state").mkdir(parents=True)
+    manifest = tmp_path / "state" / "manifest.csv"
+    engine.write_manifest(manifest, [{"id": "lig", "smiles": "CCO", "pdbqt_status": "DONE", "vina_status": "PENDING"}])
+    delta = tmp_path / "state" / "manifest.jsonl"
+    delta.write_text(
+        json.dumps({"id": "lig", "vina_status": "DONE", "vina_score": -7.1, "not_a_field": "x"}) + "\n"
+        + json.dumps({"id": "lig2", "vina_status": "FAILED"}) + "\n"
+        + '{"id": "lig", "vina_sta',
+        encoding="utf-8",
+    )
+
+    rows = {r["id"]: r for r in engine.read_manifest(manifest)}
+    assert rows["lig"]["smiles"] == "CCO"
+    assert rows["lig"]["vina_status"] == "DONE"
+    assert rows["lig"]["vina_score"] == "-7.1"
+    assert "not_a_field" not in rows["lig"]
+    assert rows["lig2"]["vina_status"] == "FAILED"
+    summary = engine._build_result_summary(engine._project_paths(tmp_path))
+    assert (summary["vina_done"], summary["vina_failed"]) == (1, 1)
+
+    engine.write_manifest(manifest, list(rows.values()))
+    assert not delta.exists()
+    assert {r["id"]: r["vina_status"] for r in engine.read_manifest(manifest)} == {"lig": "DONE", "lig2": "FAILED"}
+
+
+def test_read_manifest_cache_sees_rewrites_and_isolates_callers(tmp_path):
+    manifest = tmp_path / "state" / "manifest.csv"
+    engine.write_manifest(manifest, [{"id": "lig", "vina_status": "PENDING"}])
+    rows = engine.read_manifest(manifest)
+    assert rows[0]["vina_status"] == "PENDING"
+
+    rows[0]["vina_status"] = "MUTATED"
+    rows.append({"id": "extra"})
+    again = engine.read_manifest(manifest)
+    assert [(r["id"], r["vina_status"]) for r in again] == [("lig", "PENDING")]
+
+    # Same row count and byte length: only the atomic replace tells the cache apart.
+    engine.write_manifest(manifest, [{"id": "lig", "vina_status": "FAILED!"}])
+    assert engine.read_manifest(manifest)[0]["vina_status"] == "FAILED!"
+
+
+def test_read_input_count_matches_dictreader(tmp_path):
+    samples = [
+        b"",
+        b"id,smiles\n",
+        b"id,smiles",
+        b"id,smiles\nlig,CCO",
+        b"id,smiles\nlig,CCO\nlig2,CCC\n",
+        b"id,smiles\r\nlig,CCO\r\n\r\nlig2,CCC\r\n",
+        b"id,smiles\n\n\nlig,CCO\n\n",
+        b"\nid,smiles\nlig,CCO\n",
+        b"\n\nlig,CCO\n",
+        b'id,smiles\n"lig\n1",CCO\nlig2,CCC\n',
+        b"id,smiles\rlig,CCO\rlig2,CCC\r",
+    ]
+    path = tmp_path / "input.csv"
+    for data in samples:
+        path.write_bytes(data)
+        with path.open("r", encoding="utf-8", newline="") as f:
+            expected = sum(1 for _ in csv.DictReader(f))
+        assert engine._read_input_count(path) == expected, data
+    assert engine._read_input_count(tmp_path / "missing.csv") == 0
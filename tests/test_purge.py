@@ -3,7 +3,7 @@ from pathlib import Path
 import click
 import pytest
 
-from moldockpipe.purge import validate_project_dir
+from moldockpipe.purge import STATE_CACHES, purge_project, validate_project_dir
 
 
 def test_validate_project_dir_allows_missing_input_csv(tmp_path: Path):
@@ -16,3 +16,21 @@ def test_validate_project_dir_allows_missing_input_csv(tmp_path: Path):
 def test_validate_project_dir_requires_config_run_yml(tmp_path: Path):
     with pytest.raises(click.ClickException):
         validate_project_dir(tmp_path)
+
+
+def test_purge_removes_state_caches(tmp_path: Path):
+    (tmp_path / "config").mkdir(parents=True, exist_ok=True)
+    (tmp_path / "config" / "run.yml").write_text("dock: {}\n", encoding="utf-8")
+    state = tmp_path / "state"
+    (state / "vina_maps" / "abc_123").mkdir(parents=True)
+    (state / "vina_maps" / "abc_123" / "receptor.C_A.map").write_text("x", encoding="utf-8")
+    for name in ("run_yml_cache.json", "preflight_cache.json", "current_config.json", "pose_index.json",
+                 "validation_cache.json", "digest_cache.json"):
+        (state / name).write_text("{}", encoding="utf-8")
+    (state / "manifest.jsonl").write_text('{"id": "lig"}\n', encoding="utf-8")
+
+    purge_project(tmp_path, confirm1="yes", confirm2="yes")
+
+    assert not any((tmp_path / rel).exists() for rel in STATE_CACHES)
+    assert (state / "manifest.jsonl").read_text(encoding="utf-8") == ""
+    assert (state / "manifest.csv").exists()
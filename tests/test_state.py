@@ -34,3 +34,24 @@ def test_manifest_legacy_vina_ver_column_tolerated(tmp_path):
     write_manifest(path, loaded)
     header = path.read_text(encoding="utf-8").splitlines()[0]
     assert "vina_ver" not in header
+
+
+def test_manifest_legacy_receptor_sha1_column_renamed(tmp_path):
+    path = tmp_path / "state" / "manifest.csv"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        "id,smiles,vina_status,receptor_sha1\n"
+        "lig1,CCO,DONE,abc123\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "state" / "manifest.jsonl").write_text(
+        '{"id": "lig2", "vina_status": "DONE", "receptor_sha1": "def456"}\n', encoding="utf-8"
+    )
+    loaded = {row["id"]: row for row in read_manifest(path)}
+    assert loaded["lig1"]["receptor_digest"] == "abc123"
+    assert loaded["lig2"]["receptor_digest"] == "def456"
+    assert "receptor_sha1" not in loaded["lig1"]
+
+    write_manifest(path, loaded.values())
+    header = path.read_text(encoding="utf-8").splitlines()[0].split(",")
+    assert "receptor_digest" in header and "receptor_sha1" not in header